@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Measure cold-start time: per-module import cost and create_app() wall time
+
+Usage:
+    python benchmarks/startup_report.py [--top 25] [--runs 3]
+
+Each run happens in a fresh interpreter with `-X importtime`, so the numbers
+reflect what a newly booted gunicorn worker pays.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_SNIPPET = """
+import time
+start = time.perf_counter()
+from src.app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(f"STARTUP import_ms={(imported - start) * 1000:.1f} create_app_ms={(done - imported) * 1000:.1f}")
+"""
+
+
+def run_once():
+    """Boot the app in a fresh interpreter and return (timings, import rows)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SNIPPET],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    
+    timings = {}
+    for line in result.stdout.splitlines():
+        if line.startswith('STARTUP '):
+            for field in line.split()[1:]:
+                key, value = field.split('=')
+                timings[key] = float(value)
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|', 1).split('|')]
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    
+    return timings, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=25, help='number of modules to list')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to average over')
+    args = parser.parse_args()
+    
+    all_timings = []
+    cumulative = {}
+    for _ in range(args.runs):
+        timings, rows = run_once()
+        all_timings.append(timings)
+        for name, _, cumulative_us in rows:
+            cumulative.setdefault(name, []).append(cumulative_us)
+    
+    print(f"Startup over {args.runs} run(s) (median):")
+    for key in ('import_ms', 'create_app_ms'):
+        print(f"  {key:<15} {statistics.median(t[key] for t in all_timings):>8.1f} ms")
+    
+    # Top-level packages only - nested modules are already in their parent's cumulative time
+    top_level = {
+        name: statistics.median(values)
+        for name, values in cumulative.items()
+        if '.' not in name or name.startswith('src.')
+    }
+    
+    print(f"\nSlowest imports (cumulative, top {args.top}):")
+    print(f"  {'module':<50} {'ms':>8}")
+    for name, cumulative_us in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<50} {cumulative_us / 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Gunicorn configuration - picked up automatically from the project root"""
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import ASYNC_WORKER_CLASSES, worker_settings
+
+settings = worker_settings()
+
+# Workers write Prometheus metrics to shared files so any worker can serve a
+# scrape with totals for all of them (see src/metrics.py). Start each boot clean.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'go4me-prometheus'))
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = settings['worker_class']
+workers = settings['workers']
+threads = settings['threads']
+worker_connections = settings['worker_connections']
+
+# Import the app once in the master so workers fork with it already loaded.
+# gevent workers monkey-patch in init_process, after post_fork, so they must
+# load it themselves - module-level locks would otherwise be real OS locks.
+preload_app = worker_class not in ASYNC_WORKER_CLASSES
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Never share pooled connections opened in the master with a worker"""
+    if not server.cfg.preload_app:
+        return  # nothing was inherited; importing the app here would precede monkey-patching
+    
+    from src.database import db
+    from wsgi import app
+    
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Let psycopg2 yield to other green threads while it waits on Postgres"""
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the shared metrics"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,7 +3,7 @@
 
 from src.app import create_app
 from src.database import db
-from src.models import User, Service, Agent
+from src.models import User, Service, Agent, MenuItem
 from datetime import datetime
 
 def init_database():
@@ -24,7 +24,7 @@ def init_database():
                 slug='innout',
                 description='Hot, fresh In-N-Out delivered to your door. We wait in line so you don\'t have to.',
                 tagline='They wait. You eat.',
-                base_price=10.00,
+                base_price_cents=1000,
                 price_display='$10 + food costs',
                 icon='🍴',
                 estimated_time=45,
@@ -36,7 +36,7 @@ def init_database():
                 slug='dmv',
                 description='Skip the DMV nightmare. We handle registration, renewals, and more.',
                 tagline='We brave the line.',
-                base_price=12.00,
+                base_price_cents=1200,
                 price_display='$12 + DMV fees',
                 icon='📄',
                 estimated_time=120,
@@ -48,7 +48,7 @@ def init_database():
                 slug='eyes-on',
                 description='Visual verification services. Get photo/video proof of anything, anywhere.',
                 tagline='Photo/video proof on-site.',
-                base_price=9.00,
+                base_price_cents=900,
                 price_display='$9-12',
                 icon='📷',
                 estimated_time=30,
@@ -60,7 +60,7 @@ def init_database():
                 slug='lost-found',
                 description='Forgot something? We\'ll retrieve it for you.',
                 tagline='Forgot it? We fetch it.',
-                base_price=9.00,
+                base_price_cents=900,
                 price_display='$9-12',
                 icon='📦',
                 estimated_time=60,
@@ -72,7 +72,7 @@ def init_database():
                 slug='dry-cleaning',
                 description='Pickup and drop-off dry cleaning service.',
                 tagline='Pickup, drop, done.',
-                base_price=10.00,
+                base_price_cents=1000,
                 price_display='$10 + cleaning costs',
                 icon='👕',
                 estimated_time=30,
@@ -84,7 +84,7 @@ def init_database():
                 slug='custom',
                 description='Have a unique task? Name it and we\'ll find an agent to handle it.',
                 tagline='Name your task. We\'ll find an agent. (Beta)',
-                base_price=15.00,
+                base_price_cents=1500,
                 price_display='Starting at $15',
                 icon='✓',
                 estimated_time=90,
@@ -96,6 +96,28 @@ def init_database():
         
         for service in services:
             db.session.add(service)
+        db.session.flush()  # Get the service IDs
+        
+        # Menu prices (in cents) for services that buy items for the customer
+        print("Creating menu items...")
+        innout = services[0]
+        menu = [
+            ('double-double', 'Double-Double', 575),
+            ('cheeseburger', 'Cheeseburger', 395),
+            ('hamburger', 'Hamburger', 345),
+            ('fries', 'French Fries', 245),
+            ('animal-fries', 'Animal Style Fries', 485),
+            ('shake', 'Shake', 325),
+            ('soft-drink', 'Soft Drink', 210),
+        ]
+        for position, (sku, name, price_cents) in enumerate(menu, start=1):
+            db.session.add(MenuItem(
+                service_id=innout.id,
+                sku=sku,
+                name=name,
+                price_cents=price_cents,
+                sort_order=position
+            ))
         
         # Create sample admin user
         print("Creating admin user...")
@@ -150,7 +172,7 @@ def init_database():
             completed_jobs=23,
             cancelled_jobs=2,
             average_rating=4.8,
-            total_earnings=575.00
+            total_earnings_cents=57500
         )
         db.session.add(agent_profile)
         
@@ -0,0 +1,62 @@
+"""add indexes matching order, notification, payment and agent query patterns
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+AVAILABLE_ORDERS_WHERE = "status = 'pending' AND agent_id IS NULL"
+
+INDEXES = [
+    ('ix_orders_customer_status_created', 'orders', ['customer_id', 'status', 'created_at'], None),
+    ('ix_orders_agent_status_created', 'orders', ['agent_id', 'status', 'created_at'], None),
+    ('ix_orders_available_created', 'orders', ['created_at'], AVAILABLE_ORDERS_WHERE),
+    ('ix_notifications_order_id', 'notifications', ['order_id'], None),
+    ('ix_payments_order_id', 'payments', ['order_id'], None),
+    ('ix_agents_available_background_check', 'agents', ['is_available', 'background_check_status'], None),
+]
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    if _is_postgres():
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction, but it
+        # doesn't block writes to the live tables while the index builds.
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                op.create_index(
+                    name, table, columns,
+                    postgresql_where=sa.text(where) if where else None,
+                    postgresql_concurrently=True,
+                    if_not_exists=True
+                )
+    else:
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,79 @@
+"""normalise stored phone numbers to E.164 and index users.phone
+
+Revision ID: 5b7f3d8e2a61
+Revises: c2d9e07a5b14
+Create Date: 2026-10-19 14:22:48.310557
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from src.services.phone_numbers import to_e164
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7f3d8e2a61'
+down_revision = 'c2d9e07a5b14'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _backfill(table, column):
+    """Rewrite a phone column to E.164 in id-ordered batches, leaving unparseable values alone
+    
+    Prints each skipped row and a total, so they can be fixed by hand.
+    """
+    bind = op.get_bind()
+    last_id = 0
+    skipped = 0
+    while True:
+        rows = bind.execute(sa.text(
+            f"SELECT id, {column} FROM {table} WHERE id > :last_id AND {column} IS NOT NULL "
+            f"ORDER BY id LIMIT {BATCH_SIZE}"
+        ), {'last_id': last_id}).fetchall()
+        if not rows:
+            break
+        
+        updates = []
+        for row_id, phone in rows:
+            try:
+                normalised = to_e164(phone)
+            except ValueError:
+                print(f"{table}.{column} id={row_id}: invalid phone number left as is")
+                skipped += 1
+                continue
+            if normalised != phone:
+                updates.append({'row_id': row_id, 'phone': normalised})
+        
+        if updates:
+            bind.execute(sa.text(f"UPDATE {table} SET {column} = :phone WHERE id = :row_id"), updates)
+        last_id = rows[-1][0]
+    
+    if skipped:
+        print(f"{table}.{column}: {skipped} invalid phone number(s) left as is - fix them manually")
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    _backfill('users', 'phone')
+    _backfill('orders', 'guest_phone')
+    
+    if _is_postgres():
+        # Build without blocking sign-ups and profile updates
+        with op.get_context().autocommit_block():
+            op.create_index('ix_users_phone', 'users', ['phone'], postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_users_phone', 'users', ['phone'], if_not_exists=True)
+
+
+def downgrade():
+    # Normalised numbers are left in place - they're still valid phone numbers
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_users_phone', table_name='users', postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index('ix_users_phone', table_name='users', if_exists=True)
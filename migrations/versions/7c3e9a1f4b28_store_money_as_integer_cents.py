@@ -0,0 +1,66 @@
+"""store money as integer cents
+
+Revision ID: 7c3e9a1f4b28
+Revises: d41a7c9e5f02
+Create Date: 2026-10-19 18:05:12.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9a1f4b28'
+down_revision = 'd41a7c9e5f02'
+branch_labels = None
+depends_on = None
+
+# table -> [(dollar column, cents column, nullable)]
+MONEY_COLUMNS = {
+    'services': [('base_price', 'base_price_cents', False)],
+    'menu_items': [('price', 'price_cents', False)],
+    'orders': [
+        ('service_fee', 'service_fee_cents', False),
+        ('additional_costs', 'additional_costs_cents', True),
+        ('total_amount', 'total_amount_cents', False),
+    ],
+    'payments': [
+        ('amount', 'amount_cents', False),
+        ('refund_amount', 'refund_amount_cents', True),
+    ],
+    'agents': [('total_earnings', 'total_earnings_cents', True)],
+}
+
+
+def upgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for _, cents, _ in columns:
+                batch_op.add_column(sa.Column(cents, sa.Integer(), nullable=True))
+        
+        op.execute(f"UPDATE {table} SET " + ', '.join(
+            f"{cents} = CAST(ROUND({dollars} * 100) AS INTEGER)" for dollars, cents, _ in columns
+        ))
+        
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for dollars, cents, nullable in columns:
+                if not nullable:
+                    batch_op.alter_column(cents, existing_type=sa.Integer(), nullable=False)
+                batch_op.drop_column(dollars)
+
+
+def downgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for dollars, _, _ in columns:
+                batch_op.add_column(sa.Column(dollars, sa.Numeric(precision=10, scale=2), nullable=True))
+        
+        op.execute(f"UPDATE {table} SET " + ', '.join(
+            f"{dollars} = {cents} / 100.0" for dollars, cents, _ in columns
+        ))
+        
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for dollars, cents, nullable in columns:
+                if not nullable:
+                    batch_op.alter_column(dollars, existing_type=sa.Numeric(precision=10, scale=2), nullable=False)
+                batch_op.drop_column(cents)
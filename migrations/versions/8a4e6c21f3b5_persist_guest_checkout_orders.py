@@ -0,0 +1,46 @@
+"""persist guest checkout orders on the orders table
+
+Revision ID: 8a4e6c21f3b5
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-19 11:40:05.512873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6c21f3b5'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('guest_name', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('guest_phone', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('guest_email', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('checkout_session_id', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('line_items', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('paid_at', sa.DateTime(), nullable=True))
+        batch_op.alter_column('customer_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.create_index('ix_orders_checkout_session_id', ['checkout_session_id'], unique=True)
+    
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+    
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_checkout_session_id')
+        batch_op.alter_column('customer_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('paid_at')
+        batch_op.drop_column('line_items')
+        batch_op.drop_column('checkout_session_id')
+        batch_op.drop_column('guest_email')
+        batch_op.drop_column('guest_phone')
+        batch_op.drop_column('guest_name')
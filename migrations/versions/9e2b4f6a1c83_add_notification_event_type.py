@@ -0,0 +1,45 @@
+"""add notifications.event_type with a unique (order_id, event_type) key
+
+Revision ID: 9e2b4f6a1c83
+Revises: 5b7f3d8e2a61
+Create Date: 2026-10-19 15:48:10.774392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2b4f6a1c83'
+down_revision = '5b7f3d8e2a61'
+branch_labels = None
+depends_on = None
+
+
+CONSTRAINT = 'uq_notifications_order_event'
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    # Existing rows keep a NULL event_type, which the unique key ignores
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('event_type', sa.String(length=50), nullable=True))
+        if not _is_postgres():
+            batch_op.create_unique_constraint(CONSTRAINT, ['order_id', 'event_type'])
+    
+    if _is_postgres():
+        # Build the unique index without blocking writes, then promote it to
+        # the constraint - that step only takes a brief lock
+        with op.get_context().autocommit_block():
+            op.create_index(CONSTRAINT, 'notifications', ['order_id', 'event_type'], unique=True,
+                            postgresql_concurrently=True, if_not_exists=True)
+        op.execute(f"ALTER TABLE notifications ADD CONSTRAINT {CONSTRAINT} UNIQUE USING INDEX {CONSTRAINT}")
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_constraint(CONSTRAINT, type_='unique')
+        batch_op.drop_column('event_type')
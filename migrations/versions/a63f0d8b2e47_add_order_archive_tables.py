@@ -0,0 +1,58 @@
+"""add archive tables for finished orders, notifications and payments
+
+Revision ID: a63f0d8b2e47
+Revises: e8b5d2c47a91
+Create Date: 2026-10-19 20:26:03.117842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a63f0d8b2e47'
+down_revision = 'e8b5d2c47a91'
+branch_labels = None
+depends_on = None
+
+# archive table -> (hot table, indexes)
+ARCHIVES = {
+    'orders_archive': ('orders', {
+        'ix_orders_archive_order_number': ['order_number'],
+        'ix_orders_archive_customer_created': ['customer_id', 'created_at'],
+        'ix_orders_archive_agent_created': ['agent_id', 'created_at'],
+    }),
+    'notifications_archive': ('notifications', {
+        'ix_notifications_archive_order_id': ['order_id'],
+    }),
+    'payments_archive': ('payments', {
+        'ix_payments_archive_order_id': ['order_id'],
+    }),
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    for archive, (source, indexes) in ARCHIVES.items():
+        # Mirror the hot table as it is now, so INSERT ... SELECT lines up
+        hot = sa.Table(source, sa.MetaData(), autoload_with=bind)
+        op.create_table(archive,
+            *[
+                sa.Column(column.name, column.type, primary_key=column.primary_key,
+                          nullable=column.nullable, autoincrement=False)
+                for column in hot.columns
+            ],
+            sa.Column('archived_at', sa.DateTime(), nullable=False)
+        )
+        with op.batch_alter_table(archive, schema=None) as batch_op:
+            for name, columns in indexes.items():
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for archive, (_, indexes) in ARCHIVES.items():
+        with op.batch_alter_table(archive, schema=None) as batch_op:
+            for name in indexes:
+                batch_op.drop_index(name)
+        
+        op.drop_table(archive)
@@ -0,0 +1,45 @@
+"""add content-addressed order photos
+
+Revision ID: b7d14e9c3a60
+Revises: f29c6e1b8d53
+Create Date: 2026-10-19 22:03:36.551209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d14e9c3a60'
+down_revision = 'f29c6e1b8d53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_photos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('uploaded_by', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('content_type', sa.String(length=50), nullable=False),
+        sa.Column('extension', sa.String(length=10), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('order_id', 'kind', 'content_hash', name='uq_order_photos_order_kind_hash')
+    )
+    with op.batch_alter_table('order_photos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_photos_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_photos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_photos_content_hash'))
+    
+    op.drop_table('order_photos')
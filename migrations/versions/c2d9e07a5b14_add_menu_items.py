@@ -0,0 +1,64 @@
+"""add menu_items for server-side pricing
+
+Revision ID: c2d9e07a5b14
+Revises: 8a4e6c21f3b5
+Create Date: 2026-10-19 13:05:27.904316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d9e07a5b14'
+down_revision = '8a4e6c21f3b5'
+branch_labels = None
+depends_on = None
+
+# Seed prices for existing deployments (same list as init_db.py)
+INNOUT_MENU = [
+    ('double-double', 'Double-Double', 5.75),
+    ('cheeseburger', 'Cheeseburger', 3.95),
+    ('hamburger', 'Hamburger', 3.45),
+    ('fries', 'French Fries', 2.45),
+    ('animal-fries', 'Animal Style Fries', 4.85),
+    ('shake', 'Shake', 3.25),
+    ('soft-drink', 'Soft Drink', 2.10),
+]
+
+
+def upgrade():
+    op.create_table('menu_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('sku', sa.String(length=50), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('sort_order', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('service_id', 'sku', name='uq_menu_items_service_sku')
+    )
+    
+    innout_id = op.get_bind().execute(sa.text("SELECT id FROM services WHERE slug = 'innout'")).scalar()
+    if innout_id is not None:
+        now = datetime.utcnow()
+        menu_items = sa.table('menu_items',
+            sa.column('service_id', sa.Integer), sa.column('sku', sa.String),
+            sa.column('name', sa.String), sa.column('price', sa.Numeric),
+            sa.column('is_active', sa.Boolean), sa.column('sort_order', sa.Integer),
+            sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime)
+        )
+        op.bulk_insert(menu_items, [
+            {'service_id': innout_id, 'sku': sku, 'name': name, 'price': price, 'is_active': True,
+             'sort_order': position, 'created_at': now, 'updated_at': now}
+            for position, (sku, name, price) in enumerate(INNOUT_MENU, start=1)
+        ])
+
+
+def downgrade():
+    op.drop_table('menu_items')
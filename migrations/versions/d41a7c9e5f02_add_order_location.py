@@ -0,0 +1,28 @@
+"""add order location for dispatching nearby agents
+
+Revision ID: d41a7c9e5f02
+Revises: 9e2b4f6a1c83
+Create Date: 2026-10-19 16:31:57.220649
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c9e5f02'
+down_revision = '9e2b4f6a1c83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('location_lat', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('location_lng', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('location_lng')
+        batch_op.drop_column('location_lat')
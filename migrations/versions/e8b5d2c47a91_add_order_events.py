@@ -0,0 +1,59 @@
+"""add append-only order event log
+
+Revision ID: e8b5d2c47a91
+Revises: 7c3e9a1f4b28
+Create Date: 2026-10-19 19:12:40.381957
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b5d2c47a91'
+down_revision = '7c3e9a1f4b28'
+branch_labels = None
+depends_on = None
+
+# Existing history, rebuilt from the lifecycle timestamps (in lifecycle order)
+HISTORY_COLUMNS = [
+    ('created', 'created_at'),
+    ('paid', 'paid_at'),
+    ('accepted', 'accepted_at'),
+    ('started', 'started_at'),
+    ('completed', 'completed_at'),
+    ('cancelled', 'cancelled_at'),
+]
+
+
+def upgrade():
+    op.create_table('order_events',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=20), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+        sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.create_index('ix_order_events_order_seq', ['order_id', 'seq'], unique=False)
+    
+    # Oldest first, so seq follows time across orders as it will from now on
+    history = ' UNION ALL '.join(
+        f"SELECT id AS order_id, '{event_type}' AS event_type, {column} AS created_at, {step} AS step "
+        f"FROM orders WHERE {column} IS NOT NULL"
+        for step, (event_type, column) in enumerate(HISTORY_COLUMNS)
+    )
+    op.execute(
+        "INSERT INTO order_events (order_id, event_type, created_at) "
+        f"SELECT order_id, event_type, created_at FROM ({history}) AS history "
+        "ORDER BY created_at, order_id, step"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('order_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_events_order_seq')
+    
+    op.drop_table('order_events')
@@ -0,0 +1,60 @@
+"""notification retention: purgeable bodies and created_at indexes
+
+Revision ID: f29c6e1b8d53
+Revises: a63f0d8b2e47
+Create Date: 2026-10-19 21:14:48.902365
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f29c6e1b8d53'
+down_revision = 'a63f0d8b2e47'
+branch_labels = None
+depends_on = None
+
+TABLES = ['notifications', 'notifications_archive']
+INDEXES = [
+    (f'ix_{table}_{suffix}', table, columns)
+    for table in TABLES
+    for suffix, columns in (('purge_created', ['body_purged_at', 'created_at']), ('created_at', ['created_at']))
+]
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('body_purged_at', sa.DateTime(), nullable=True))
+            batch_op.alter_column('message', existing_type=sa.Text(), nullable=True)
+    
+    if _is_postgres():
+        # Build without blocking writes to the (large) notification tables
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
+    
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET message = '' WHERE message IS NULL")
+        
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('message', existing_type=sa.Text(), nullable=False)
+            batch_op.drop_column('body_purged_at')
@@ -1,13 +1,23 @@
 import os
 from flask import Flask, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Import database
+# Import configuration and database
+from src.config import engine_options, redis_url, replica_database_urls
 from src.database import db, init_db
+from src.db_pool import pool_stats
+from src.cli import register_cli
+from src.middleware.compression import init_compression
+from src.middleware.rate_limit import init_rate_limiting
+from src.middleware.read_replicas import init_read_replicas
+from src.metrics import init_metrics
+from src.tracing import init_tracing
+from src.profiling import init_profiling
 
 # Import routes
 from src.routes.auth_routes import auth_bp
@@ -15,6 +25,7 @@ from src.routes.order_routes import order_bp
 from src.routes.payment_routes import payment_bp, service_bp
 from src.routes.agent_routes import agent_bp
 from src.routes.simple_order_routes import simple_order_bp
+from src.routes.media_routes import media_bp
 
 def create_app():
     """Create and configure Flask application"""
@@ -27,20 +38,84 @@ def create_app():
         'sqlite:///go4me.db'  # Default to SQLite for development
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    
     app.config['JSON_SORT_KEYS'] = False
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))
+    app.config['COMPRESS_BR_LEVEL'] = int(os.getenv('COMPRESS_BR_LEVEL', 4))
+    app.config['COMPRESS_CACHE_TTL'] = int(os.getenv('COMPRESS_CACHE_TTL', 300))
+    app.config['PRICE_TABLE_TTL'] = int(os.getenv('PRICE_TABLE_TTL', 60))  # seconds between price reloads
+    
+    # New-job alerts: how many nearby agents to text, within what radius, how often per agent
+    app.config['DISPATCH_ALERT_AGENTS'] = int(os.getenv('DISPATCH_ALERT_AGENTS', 5))
+    app.config['DISPATCH_RADIUS_KM'] = float(os.getenv('DISPATCH_RADIUS_KM', 40))
+    app.config['DISPATCH_ALERTS_PER_MINUTE'] = int(os.getenv('DISPATCH_ALERTS_PER_MINUTE', 3))
+    
+    # Archiving: finished orders older than this move to the archive tables, a batch per transaction
+    app.config['ORDER_ARCHIVE_AFTER_DAYS'] = int(os.getenv('ORDER_ARCHIVE_AFTER_DAYS', 90))
+    app.config['ORDER_ARCHIVE_BATCH_SIZE'] = int(os.getenv('ORDER_ARCHIVE_BATCH_SIZE', 500))
+    
+    # Order photos: where files go, how big they may be, and how many resize workers per process
+    app.config['MEDIA_STORAGE'] = os.getenv('MEDIA_STORAGE', 'local')
+    app.config['MEDIA_ROOT'] = os.getenv('MEDIA_ROOT', os.path.join(app.instance_path, 'media'))
+    app.config['MEDIA_URL'] = os.getenv('MEDIA_URL', '/media')
+    app.config['MEDIA_WORKERS'] = int(os.getenv('MEDIA_WORKERS', 2))
+    app.config['MAX_PHOTO_BYTES'] = int(os.getenv('MAX_PHOTO_BYTES', 15 * 1024 * 1024))
+    app.config['MAX_PHOTO_UPLOAD_BYTES'] = int(os.getenv('MAX_PHOTO_UPLOAD_BYTES', 60 * 1024 * 1024))
+    
+    # Bulk agent imports and background-check uploads: rows written per transaction
+    app.config['AGENT_IMPORT_BATCH_SIZE'] = int(os.getenv('AGENT_IMPORT_BATCH_SIZE', 500))
+    
+    # Notification retention: drop message bodies after N days, whole rows after M days
+    app.config['NOTIFICATION_BODY_RETENTION_DAYS'] = int(os.getenv('NOTIFICATION_BODY_RETENTION_DAYS', 30))
+    app.config['NOTIFICATION_RETENTION_DAYS'] = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 365))
+    app.config['NOTIFICATION_RETENTION_BATCH_SIZE'] = int(os.getenv('NOTIFICATION_RETENTION_BATCH_SIZE', 1000))
+    
+    # Read replicas: comma-separated URLs, used by read-only requests
+    app.config['SQLALCHEMY_BINDS'] = {f'replica_{i}': url for i, url in enumerate(replica_database_urls())}
+    app.config['DB_STICKY_PRIMARY_SECONDS'] = int(os.getenv('DB_STICKY_PRIMARY_SECONDS', 5))
+    
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['TRACE_EXPORTER'] = os.getenv('TRACE_EXPORTER')  # 'console' or 'file'
+    app.config['TRACE_FILE'] = os.getenv('TRACE_FILE', 'traces.jsonl')
+    app.config['TRACE_SAMPLE_RATE'] = float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+    app.config['PROFILE_SECRET'] = os.getenv('PROFILE_SECRET')  # enables signed X-Profile requests
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', 'profiles')
+    app.config['PROFILE_FORMAT'] = os.getenv('PROFILE_FORMAT', 'pstats')  # or 'collapsed'
+    app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['REDIS_URL'] = redis_url()  # shared rate limits and replica pins; per process without it
+    
+    # Trust X-Forwarded-For from the platform's proxy so limits key on the real client IP
+    proxy_count = int(os.getenv('TRUSTED_PROXY_COUNT', 1))
+    if proxy_count:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count)
     
     # Enable CORS - allow all origins for now
     CORS(app, resources={
         r"/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "traceparent", "X-Profile"],
+            "expose_headers": ["traceparent", "X-Profile-Id"],
             "supports_credentials": False
         }
     })
     
+    # Throttle abuse-prone endpoints before any other request handling
+    init_rate_limiting(app)
+    
+    # Compress large responses for clients that accept it
+    init_compression(app)
+    
     # Initialize database
     init_db(app)
+    init_read_replicas(app)
+    init_metrics(app)
+    init_tracing(app)
+    init_profiling(app)
+    register_cli(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp)
@@ -49,6 +124,7 @@ def create_app():
     app.register_blueprint(payment_bp)
     app.register_blueprint(service_bp)
     app.register_blueprint(agent_bp)
+    app.register_blueprint(media_bp)
     
     # Health check endpoint
     @app.route('/health', methods=['GET'])
@@ -59,6 +135,16 @@ def create_app():
             'version': '1.0.0'
         }), 200
     
+    # Connection pool saturation per database bind
+    @app.route('/health/db', methods=['GET'])
+    def db_pool_health():
+        return jsonify({
+            'pools': {
+                bind_key or 'default': pool_stats(engine)
+                for bind_key, engine in db.engines.items()
+            }
+        }), 200
+    
     # Root endpoint
     @app.route('/', methods=['GET'])
     def root():
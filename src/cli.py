@@ -0,0 +1,118 @@
+import click
+from flask import current_app
+from flask_migrate import stamp
+from src.database import db
+from src.profiling import PROFILE_HEADER, sign_profile_request
+from src.services.agent_import_service import AgentImportService, import_format
+from src.services.archive_service import ArchiveService
+from src.services.retention_service import RetentionService
+from src.services.media_service import MediaService
+
+
+def register_cli(app):
+    """Register management commands on the Flask CLI"""
+    
+    @app.cli.command('create-db')
+    def create_db():
+        """Create tables on an empty database (run once per deploy, not at worker boot)"""
+        if db.inspect(db.engine).has_table('orders'):
+            click.echo('Schema already exists - apply changes with `flask db upgrade`')
+            return
+        
+        # A fresh schema already matches the models, so mark every migration applied
+        db.create_all()
+        stamp()
+        click.echo('Database tables created')
+    
+    @app.cli.command('profile-header')
+    def profile_header():
+        """Print a signed header that profiles one request (valid for 5 minutes)"""
+        secret = current_app.config.get('PROFILE_SECRET')
+        if not secret:
+            raise click.ClickException('PROFILE_SECRET is not set')
+        click.echo(f"{PROFILE_HEADER}: {sign_profile_request(secret)}")
+    
+    @app.cli.command('archive-orders')
+    @click.option('--older-than-days', type=int, help='Defaults to ORDER_ARCHIVE_AFTER_DAYS')
+    @click.option('--batch-size', type=int, help='Defaults to ORDER_ARCHIVE_BATCH_SIZE')
+    @click.option('--max-batches', type=int, help='Stop after this many batches')
+    @click.option('--pause', type=float, default=0, help='Seconds to sleep between batches')
+    def archive_orders(older_than_days, batch_size, max_batches, pause):
+        """Move completed/cancelled orders past the retention window to the archive tables"""
+        config = current_app.config
+        archived = ArchiveService.archive_orders(
+            older_than_days if older_than_days is not None else config['ORDER_ARCHIVE_AFTER_DAYS'],
+            batch_size=batch_size or config['ORDER_ARCHIVE_BATCH_SIZE'],
+            max_batches=max_batches,
+            pause=pause,
+            progress=lambda count: click.echo(f"Archived {count} orders...")
+        )
+        click.echo(f"Done - {archived} orders archived")
+    
+    @app.cli.command('compact-notifications')
+    @click.option('--body-days', type=int, help='Defaults to NOTIFICATION_BODY_RETENTION_DAYS')
+    @click.option('--delete-days', type=int, help='Defaults to NOTIFICATION_RETENTION_DAYS')
+    @click.option('--batch-size', type=int, help='Defaults to NOTIFICATION_RETENTION_BATCH_SIZE')
+    @click.option('--max-batches', type=int, help='Stop each pass after this many batches')
+    @click.option('--pause', type=float, default=0.1, help='Seconds to sleep between batches')
+    def compact_notifications(body_days, delete_days, batch_size, max_batches, pause):
+        """Apply the notification retention policy (schedule it, e.g. nightly)"""
+        config = current_app.config
+        body_days = body_days if body_days is not None else config['NOTIFICATION_BODY_RETENTION_DAYS']
+        delete_days = delete_days if delete_days is not None else config['NOTIFICATION_RETENTION_DAYS']
+        if delete_days < body_days:
+            raise click.BadParameter('must not be shorter than --body-days', param_hint='--delete-days')
+        
+        result = RetentionService.apply_notification_retention(
+            body_days,
+            delete_days,
+            batch_size=batch_size or config['NOTIFICATION_RETENTION_BATCH_SIZE'],
+            max_batches=max_batches,
+            pause=pause
+        )
+        click.echo(f"Done - {result['deleted']} notifications deleted, {result['purged']} bodies purged")
+    
+    @app.cli.command('process-photos')
+    def process_photos():
+        """Make resized variants for photos left processing (e.g. by a restart)"""
+        count = MediaService.process_pending()
+        click.echo(f"Done - {count} images processed")
+    
+    def run_bulk_file(apply, path, fmt, batch_size, dry_run, verb):
+        """Apply a CSV/NDJSON file with a bulk service function and print the outcome"""
+        try:
+            with open(path, 'rb') as stream:
+                result = apply(
+                    stream,
+                    import_format(path, fmt),
+                    batch_size=batch_size or current_app.config['AGENT_IMPORT_BATCH_SIZE'],
+                    dry_run=dry_run
+                )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        
+        for error in result['errors']:
+            click.echo(f"line {error['line']}: {error['error']}", err=True)
+        if result['failed'] > len(result['errors']):
+            click.echo(f"... and {result['failed'] - len(result['errors'])} more errors", err=True)
+        
+        prefix = 'Dry run - would have ' if dry_run else 'Done - '
+        click.echo(f"{prefix}{verb} {result['applied']} of {result['rows']} rows, {result['failed']} rejected")
+    
+    @app.cli.command('import-agents')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension')
+    @click.option('--batch-size', type=int, help='Defaults to AGENT_IMPORT_BATCH_SIZE')
+    @click.option('--dry-run', is_flag=True, help='Validate and report without writing')
+    def import_agents(path, fmt, batch_size, dry_run):
+        """Create agents from a CSV/NDJSON file (email, first_name, last_name, phone[, bio, password])"""
+        run_bulk_file(AgentImportService.import_agents, path, fmt, batch_size, dry_run, 'created')
+    
+    @app.cli.command('import-background-checks')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension')
+    @click.option('--batch-size', type=int, help='Defaults to AGENT_IMPORT_BATCH_SIZE')
+    @click.option('--dry-run', is_flag=True, help='Validate and report without writing')
+    def import_background_checks(path, fmt, batch_size, dry_run):
+        """Apply background check results from a CSV/NDJSON file (agent_id or email, status[, checked_at])"""
+        run_bulk_file(AgentImportService.apply_background_checks, path, fmt, batch_size, dry_run, 'updated')
@@ -0,0 +1,109 @@
+import os
+
+# Worker classes that multiplex many requests on green threads in one process
+ASYNC_WORKER_CLASSES = ('gevent',)
+WORKER_CLASSES = ('sync', 'gthread') + ASYNC_WORKER_CLASSES
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def worker_settings():
+    """Gunicorn concurrency derived from CPU count and environment"""
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    if worker_class not in WORKER_CLASSES:
+        raise ValueError(f"GUNICORN_WORKER_CLASS must be one of: {', '.join(WORKER_CLASSES)}")
+    cpus = os.cpu_count() or 1
+    
+    # The app mostly waits on Postgres, Stripe and Twilio, so threads are
+    # cheaper than extra processes; keep a modest number of processes per CPU.
+    workers = _env_int('WEB_CONCURRENCY', min(cpus * 2 + 1, _env_int('GUNICORN_MAX_WORKERS', 8)))
+    threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+    
+    if worker_class in ASYNC_WORKER_CLASSES:
+        concurrency = worker_connections
+    else:
+        concurrency = threads
+    
+    return {
+        'worker_class': worker_class,
+        'workers': workers,
+        'threads': threads,
+        'worker_connections': worker_connections,
+        'concurrency': concurrency,  # requests in flight per worker process
+    }
+
+
+def redis_url():
+    """REDIS_URL, refusing to start if it is set but the redis package is missing
+    
+    Without Redis the shared store falls back to per-process memory, which
+    multiplies every rate limit by the number of workers.
+    """
+    url = os.getenv('REDIS_URL')
+    if url:
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+    return url
+
+
+def replica_database_urls():
+    """Read-replica URLs from DATABASE_REPLICA_URLS (comma-separated)
+    
+    After a write a client is pinned to the primary through the shared store,
+    and only Redis shares that pin between worker processes - so replicas
+    require REDIS_URL rather than risk serving a client stale reads.
+    """
+    urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    if urls and not redis_url():
+        raise ValueError("DATABASE_REPLICA_URLS requires REDIS_URL so every worker sees read-your-writes pins")
+    return urls
+
+
+def transaction_pooling_enabled():
+    """True when connections go through a transaction-pooling proxy such as PgBouncer"""
+    return os.getenv('DB_PGBOUNCER_MODE', '').lower() in ('1', 'true', 'transaction')
+
+
+def engine_options(database_uri):
+    """SQLAlchemy engine options sized to match per-worker concurrency"""
+    from sqlalchemy.pool import NullPool
+    from src.db_pool import InstrumentedQueuePool
+    
+    if database_uri.startswith('sqlite'):
+        return {}
+    
+    options = {}
+    
+    if transaction_pooling_enabled():
+        # Consecutive transactions may land on different server connections,
+        # so nothing can rely on per-connection state such as prepared
+        # statements. psycopg2 never prepares server-side; psycopg 3 must be told.
+        if database_uri.startswith('postgresql+psycopg:'):
+            options['connect_args'] = {'prepare_threshold': None}
+    
+    if os.getenv('DB_POOL_CLASS', '').lower() == 'null':
+        # Let the proxy do all pooling: open per checkout, close on return
+        options['poolclass'] = NullPool
+        return options
+    
+    concurrency = worker_settings()['concurrency']
+    
+    # One pooled connection per thread; green-thread workers are capped so
+    # workers * (pool_size + max_overflow) stays within Postgres' limit.
+    pool_size = _env_int('DB_POOL_SIZE', min(concurrency, 10))
+    
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', max(2, pool_size // 2)),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+    })
+    return options
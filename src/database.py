@@ -1,7 +1,47 @@
+import random
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """Session that sends plain reads to a replica when the request allows it
+    
+    Writes, flushes, SELECT ... FOR UPDATE, statements marked with
+    execution_options(db_write=True) (e.g. a SELECT over data-modifying CTEs)
+    and anything after the first write in a request go to the primary, so a
+    request always reads its own writes.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            is_plain_select = (
+                clause is not None
+                and getattr(clause, 'is_select', False)
+                and getattr(clause, '_for_update_arg', None) is None
+                and not clause.get_execution_options().get('db_write')
+            )
+            
+            if self._flushing or not is_plain_select:
+                g.db_wrote = True
+            elif g.get('db_read_replica') and not g.get('db_wrote'):
+                replicas = self._db.replica_bind_keys
+                if replicas:
+                    return self._db.engines[random.choice(replicas)]
+        
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """SQLAlchemy extension aware of read-replica binds"""
+    
+    @property
+    def replica_bind_keys(self):
+        return [key for key in self.engines if key and key.startswith('replica_')]
+
+
+db = RoutingSQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 def init_db(app):
@@ -9,11 +49,8 @@ def init_db(app):
     db.init_app(app)
     migrate.init_app(app, db)
     
-    with app.app_context():
-        # Import all models here to ensure they're registered
-        from src.models import user, order, agent, service, payment, notification
-        
-        # Create all tables
-        db.create_all()
+    # Import all models here to ensure they're registered. Tables are created
+    # by `flask create-db` / migrations, never at worker boot.
+    from src.models import user, order, agent, service, payment, notification, menu_item, order_event, order_photo, archive
         
     return db
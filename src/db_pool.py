@@ -0,0 +1,79 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolWaitStats:
+    """Thread-safe counters for time spent waiting on pool checkouts"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited and how often it timed out"""
+    
+    # Callables (seconds, timed_out) notified of every checkout, e.g. metrics exporters
+    wait_observers = []
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self._record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self._record_wait(time.perf_counter() - start, timed_out=False)
+        return connection
+    
+    def _record_wait(self, seconds, timed_out):
+        self.wait_stats.record(seconds, timed_out=timed_out)
+        for observer in self.wait_observers:
+            observer(seconds, timed_out)
+
+
+def pool_stats(engine):
+    """Current saturation of an engine's connection pool"""
+    pool = engine.pool
+    stats = {'pool_class': type(pool).__name__}
+    
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            # overflow() counts up from -pool_size until the pool is full
+            'overflow': max(pool.overflow(), 0),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.wait_stats.snapshot())
+    
+    return stats
+
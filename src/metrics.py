@@ -0,0 +1,192 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import abort, current_app, g, request
+from sqlalchemy import event, func
+from src.tracing import start_span
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+        Histogram, generate_latest, multiprocess,
+    )
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # Metrics are optional - everything below becomes a no-op
+    Counter = None
+
+# In multi-worker deployments PROMETHEUS_MULTIPROC_DIR is set (see
+# gunicorn.conf.py) and every worker writes to shared files, so a scrape
+# served by any one worker reports totals for all of them.
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+if Counter is not None:
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds',
+        'HTTP request latency by route and status',
+        ['method', 'endpoint', 'status']
+    )
+    EXTERNAL_LATENCY = Histogram(
+        'external_call_duration_seconds',
+        'Latency of calls to third-party APIs',
+        ['service', 'operation']
+    )
+    EXTERNAL_ERRORS = Counter(
+        'external_call_errors_total',
+        'Failed calls to third-party APIs',
+        ['service', 'operation']
+    )
+    POOL_WAIT = Histogram(
+        'db_pool_checkout_wait_seconds',
+        'Time spent waiting for a pooled database connection',
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    )
+    POOL_TIMEOUTS = Counter(
+        'db_pool_timeouts_total',
+        'Checkouts that gave up waiting for a pooled connection'
+    )
+    POOL_IN_USE = Gauge(
+        'db_pool_connections_in_use',
+        'Connections currently checked out of the pool',
+        ['bind'],
+        multiprocess_mode='livesum'
+    )
+    POOL_OVERFLOW = Gauge(
+        'db_pool_overflow',
+        'Connections open beyond pool_size',
+        ['bind'],
+        multiprocess_mode='livesum'
+    )
+
+
+@contextmanager
+def external_call(service, operation):
+    """Time and trace a third-party API call, counting it as an error if it raises"""
+    with start_span(f"{service} {operation}", 'client', {'peer.service': service}):
+        if Counter is None:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            EXTERNAL_ERRORS.labels(service, operation).inc()
+            raise
+        finally:
+            EXTERNAL_LATENCY.labels(service, operation).observe(time.perf_counter() - start)
+
+
+def observe_pool_wait(seconds, timed_out):
+    """Observer for InstrumentedQueuePool checkout waits"""
+    if timed_out:
+        POOL_TIMEOUTS.inc()
+    else:
+        POOL_WAIT.observe(seconds)
+
+
+class AppStateCollector:
+    """Gauges computed from the database at scrape time, cached briefly"""
+    
+    CACHE_SECONDS = 15
+    _cache = (0.0, None)
+    
+    def collect(self):
+        from src.models.agent import Agent
+        from src.models.order import Order, AVAILABLE_ORDERS_WHERE
+        from src.database import db
+        
+        cached_at, counts = AppStateCollector._cache
+        if counts is None or time.monotonic() - cached_at > self.CACHE_SECONDS:
+            # Both counts are answered from indexes, not table scans
+            counts = {
+                'orders_awaiting_agent': db.session.query(func.count(Order.id)).filter(
+                    db.text(AVAILABLE_ORDERS_WHERE)
+                ).scalar(),
+                'agents_available': db.session.query(func.count(Agent.id)).filter(
+                    Agent.is_available.is_(True),
+                    Agent.background_check_status == 'approved'
+                ).scalar(),
+            }
+            AppStateCollector._cache = (time.monotonic(), counts)
+        
+        yield GaugeMetricFamily('orders_awaiting_agent', 'Pending orders with no agent assigned',
+                                value=counts['orders_awaiting_agent'])
+        yield GaugeMetricFamily('agents_available', 'Approved agents currently available',
+                                value=counts['agents_available'])
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        REQUEST_LATENCY.labels(
+            request.method,
+            request.endpoint or 'unmatched',
+            response.status_code
+        ).observe(time.perf_counter() - start)
+    return response
+
+
+def _instrument_pool(bind_key, engine):
+    label = bind_key or 'default'
+    
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_IN_USE.labels(label).inc()
+        if hasattr(engine.pool, 'overflow'):
+            POOL_OVERFLOW.labels(label).set(max(engine.pool.overflow(), 0))
+    
+    def on_checkin(dbapi_connection, connection_record):
+        POOL_IN_USE.labels(label).dec()
+        if hasattr(engine.pool, 'overflow'):
+            POOL_OVERFLOW.labels(label).set(max(engine.pool.overflow(), 0))
+    
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', on_checkin)
+
+
+def metrics_view():
+    """Prometheus scrape endpoint"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        abort(401)
+    
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    
+    output = generate_latest(registry)
+    
+    state_registry = CollectorRegistry()
+    state_registry.register(AppStateCollector())
+    output += generate_latest(state_registry)
+    
+    return output, 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app):
+    """Register request timing hooks, pool instrumentation and /metrics"""
+    if Counter is None:
+        print("prometheus_client not installed - metrics disabled")
+        return
+    
+    from src.database import db
+    from src.db_pool import InstrumentedQueuePool
+    
+    app.config.setdefault('METRICS_TOKEN', None)
+    
+    # Start the clock ahead of the rate limiter so rejected requests are timed too
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_timer)
+    app.after_request(_record_request)
+    
+    if observe_pool_wait not in InstrumentedQueuePool.wait_observers:
+        InstrumentedQueuePool.wait_observers.append(observe_pool_wait)
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            _instrument_pool(bind_key, engine)
+    
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'image/svg+xml',
+}
+
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference"""
+    configured = current_app.config['COMPRESS_ALGORITHMS']
+    return [enc for enc in configured if enc == 'gzip' or (enc == 'br' and brotli)]
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Pick the best encoding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    # Server preference breaks ties between equally weighted encodings
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(data, encoding, level):
+    """Compress bytes with the given encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _level_for(encoding, precompressed=False):
+    config = current_app.config
+    if encoding == 'br':
+        return config['COMPRESS_BR_CACHE_LEVEL' if precompressed else 'COMPRESS_BR_LEVEL']
+    return config['COMPRESS_CACHE_LEVEL' if precompressed else 'COMPRESS_LEVEL']
+
+
+def _add_vary(response):
+    vary = response.headers.get('Vary', '')
+    if 'accept-encoding' not in vary.lower():
+        response.headers['Vary'] = f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'
+
+
+class PrecompressedCache:
+    """Process-local cache of serialised bodies and their compressed variants"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build_payload, ttl):
+        """Return a cached entry, building and compressing it once when stale"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry['expires_at'] > now:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['expires_at'] > now:
+                return entry
+
+            body = json.dumps(build_payload(), separators=(',', ':')).encode('utf-8')
+            variants = {None: body}
+            if len(body) >= current_app.config['COMPRESS_MIN_SIZE']:
+                for encoding in available_encodings():
+                    variants[encoding] = compress_body(body, encoding, _level_for(encoding, precompressed=True))
+
+            entry = {
+                'variants': variants,
+                'etag': hashlib.sha1(body).hexdigest(),
+                'expires_at': now + ttl,
+            }
+            self._entries[key] = entry
+            return entry
+
+    def invalidate(self, key=None):
+        """Drop one cached body, or all of them"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+precompressed_cache = PrecompressedCache()
+
+
+def precompressed_response(key, build_payload, ttl=None):
+    """Serve a cacheable JSON payload, compressed once per TTL rather than per request"""
+    if ttl is None:
+        ttl = current_app.config['COMPRESS_CACHE_TTL']
+
+    entry = precompressed_cache.get_or_build(key, build_payload, ttl)
+    variants = entry['variants']
+    encoding = negotiate_encoding(
+        request.headers.get('Accept-Encoding'),
+        [enc for enc in variants if enc is not None]
+    )
+
+    response = current_app.response_class(variants[encoding], mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    _add_vary(response)
+    # Each encoding is a distinct representation, so it gets its own strong ETag
+    response.set_etag(f"{entry['etag']}-{encoding}" if encoding else entry['etag'])
+    return response.make_conditional(request)
+
+
+def compress_response(response):
+    """after_request hook compressing large, compressible responses"""
+    config = current_app.config
+
+    if (response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    _add_vary(response)
+
+    if (response.content_length or 0) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), available_encodings())
+    if not encoding:
+        return response
+
+    response.set_data(compress_body(response.get_data(), encoding, _level_for(encoding)))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Register negotiated response compression on the app"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)  # bytes
+    app.config.setdefault('COMPRESS_LEVEL', 6)  # gzip, 1-9
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)  # brotli, 0-11
+    app.config.setdefault('COMPRESS_CACHE_LEVEL', 9)  # cached bodies are compressed once, so go harder
+    app.config.setdefault('COMPRESS_BR_CACHE_LEVEL', 11)
+    app.config.setdefault('COMPRESS_CACHE_TTL', 300)  # seconds
+    app.config.setdefault('COMPRESS_ALGORITHMS', ['br', 'gzip'])
+
+    app.after_request(compress_response)
@@ -0,0 +1,64 @@
+import math
+from flask import current_app, jsonify, request
+from src.services.auth_service import AuthService
+from src.services.shared_store import get_shared_store
+
+# endpoint -> [(scope, requests, per seconds)]. Scopes: 'ip' (client address),
+# 'user' (JWT user, falling back to IP) and 'route' (all clients combined).
+# Buckets live in Redis when REDIS_URL is set; without it each worker process
+# keeps its own, so the effective limit is these numbers times the workers.
+DEFAULT_RATE_LIMITS = {
+    'auth.login': [('ip', 10, 60)],
+    'auth.register': [('ip', 5, 60)],
+    'orders.create_order': [('user', 10, 60), ('ip', 30, 60)],
+    'simple_orders.create_order': [('ip', 10, 60)],
+    # Unauthenticated and sends SMS: cap each caller and the Twilio spend overall
+    'simple_orders.notify_gopher': [('ip', 5, 60), ('route', 60, 60)],
+}
+
+
+def _scope_key(scope):
+    if scope == 'route':
+        return 'all'
+    if scope == 'user':
+        user_id = AuthService.user_id_from_request()
+        if user_id:
+            return f"user:{user_id}"
+    return f"ip:{request.remote_addr}"
+
+
+def enforce_rate_limits():
+    """before_request hook: reject over-limit requests before any parsing or DB work"""
+    if request.method == 'OPTIONS':
+        return None
+    
+    rules = current_app.config['RATE_LIMITS'].get(request.endpoint)
+    if not rules:
+        return None
+    
+    store = get_shared_store()
+    for scope, limit, period in rules:
+        key = f"ratelimit:{request.endpoint}:{scope}:{_scope_key(scope)}"
+        try:
+            allowed, retry_after = store.take_token(key, limit, limit / period)
+        except Exception as e:
+            # Never take the API down because the limiter's store is unreachable
+            print(f"Rate limiter unavailable: {str(e)}")
+            return None
+        
+        if not allowed:
+            response = jsonify({'error': 'Too many requests, please try again later'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
+    
+    return None
+
+
+def init_rate_limiting(app):
+    """Register token-bucket rate limiting ahead of every other request hook"""
+    app.config.setdefault('RATE_LIMIT_ENABLED', True)
+    app.config.setdefault('RATE_LIMITS', DEFAULT_RATE_LIMITS)
+    
+    if app.config['RATE_LIMIT_ENABLED']:
+        app.before_request_funcs.setdefault(None, []).insert(0, enforce_rate_limits)
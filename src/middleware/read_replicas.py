@@ -0,0 +1,65 @@
+from functools import wraps
+from flask import current_app, g, request
+from src.services.auth_service import AuthService
+from src.services.shared_store import MemoryStore, get_shared_store
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _pin_key():
+    """Who a primary pin applies to: the authenticated user, else the client IP"""
+    if 'db_pin_key' not in g:
+        user_id = AuthService.user_id_from_request()
+        g.db_pin_key = f"db-pin:user:{user_id}" if user_id else f"db-pin:ip:{request.remote_addr}"
+    return g.db_pin_key
+
+
+def primary_only(f):
+    """Keep a read-only endpoint on the primary (it must see just-committed writes)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.pop('db_read_replica', None)
+        return f(*args, **kwargs)
+    return decorated
+
+
+def route_reads_to_replica():
+    """before_request hook: let read-only requests use a replica unless pinned"""
+    if request.method not in READ_METHODS:
+        return
+    
+    try:
+        pinned = get_shared_store().get(_pin_key())
+    except Exception as e:
+        # Can't tell whether the client just wrote - the primary is always correct
+        print(f"Replica pin store unavailable: {str(e)}")
+        return
+    
+    if not pinned:
+        g.db_read_replica = True
+
+
+def pin_primary_after_write(response):
+    """after_request hook: keep a client on the primary for a while after it writes"""
+    if response.status_code < 400 and (request.method not in READ_METHODS or g.get('db_wrote')):
+        try:
+            get_shared_store().set(_pin_key(), '1', current_app.config['DB_STICKY_PRIMARY_SECONDS'])
+        except Exception as e:
+            # The write succeeded; don't fail the response over the pin
+            print(f"Replica pin store unavailable: {str(e)}")
+    return response
+
+
+def init_read_replicas(app):
+    """Route read-only requests to replica binds, if any are configured"""
+    app.config.setdefault('DB_STICKY_PRIMARY_SECONDS', 5)
+    
+    if not any(key.startswith('replica_') for key in app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+    if isinstance(get_shared_store(), MemoryStore):
+        # A pin set by one worker would be invisible to the others
+        print("Read replicas disabled: primary pins need a shared store - set REDIS_URL")
+        return
+    
+    app.before_request(route_reads_to_replica)
+    app.after_request(pin_primary_after_write)
@@ -4,5 +4,10 @@ from src.models.agent import Agent
 from src.models.service import Service
 from src.models.payment import Payment
 from src.models.notification import Notification
+from src.models.menu_item import MenuItem
+from src.models.order_event import OrderEvent
+from src.models.order_photo import OrderPhoto
+from src.models.archive import ArchivedOrder, ArchivedNotification, ArchivedPayment
 
-__all__ = ['User', 'Order', 'Agent', 'Service', 'Payment', 'Notification']
+__all__ = ['User', 'Order', 'Agent', 'Service', 'Payment', 'Notification', 'MenuItem', 'OrderEvent', 'OrderPhoto',
+           'ArchivedOrder', 'ArchivedNotification', 'ArchivedPayment']
@@ -1,9 +1,16 @@
 from datetime import datetime
 from src.database import db
+from src.models.money import to_dollars
+
+BACKGROUND_CHECK_STATUSES = ('pending', 'approved', 'rejected')
 
 class Agent(db.Model):
     """Agent/Gopher model"""
     __tablename__ = 'agents'
+    __table_args__ = (
+        # Dispatch looks up available, approved agents
+        db.Index('ix_agents_available_background_check', 'is_available', 'background_check_status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
@@ -26,7 +33,7 @@ class Agent(db.Model):
     completed_jobs = db.Column(db.Integer, default=0)
     cancelled_jobs = db.Column(db.Integer, default=0)
     average_rating = db.Column(db.Float, default=0.0)
-    total_earnings = db.Column(db.Numeric(10, 2), default=0)
+    total_earnings_cents = db.Column(db.Integer, default=0)
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -63,7 +70,7 @@ class Agent(db.Model):
                 'completed_jobs': self.completed_jobs,
                 'average_rating': float(self.average_rating) if self.average_rating else 0,
                 'completion_rate': self.completion_rate,
-                'total_earnings': float(self.total_earnings) if self.total_earnings else 0,
+                'total_earnings': to_dollars(self.total_earnings_cents),
             })
             
         if self.user:
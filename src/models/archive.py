@@ -0,0 +1,75 @@
+from src.database import db
+from src.models.order import Order
+from src.models.notification import Notification
+from src.models.payment import Payment
+
+# Orders in these statuses never change again, so they can leave the hot tables
+ARCHIVED_STATUSES = ('completed', 'cancelled')
+
+
+def archive_columns(table):
+    """Columns for a hot table's archive: same names and types plus archived_at
+    
+    No defaults, foreign keys or unique constraints - rows are only ever
+    copied in whole. A migration that adds a column to a hot table must add
+    it to the archive too.
+    """
+    columns = [
+        db.Column(column.name, column.type, primary_key=column.primary_key,
+                  nullable=column.nullable, autoincrement=False)
+        for column in table.columns
+    ]
+    columns.append(db.Column('archived_at', db.DateTime, nullable=False))
+    return columns
+
+
+class ArchivedOrder(db.Model):
+    """Completed or cancelled order moved out of the hot orders table"""
+    __table__ = db.Table(
+        'orders_archive',
+        *archive_columns(Order.__table__),
+        # Order number uniqueness checks and customer/agent history
+        db.Index('ix_orders_archive_order_number', 'order_number'),
+        db.Index('ix_orders_archive_customer_created', 'customer_id', 'created_at'),
+        db.Index('ix_orders_archive_agent_created', 'agent_id', 'created_at'),
+    )
+    
+    # Relationships
+    customer = db.relationship('User', primaryjoin='foreign(ArchivedOrder.customer_id) == User.id', viewonly=True)
+    agent = db.relationship('Agent', primaryjoin='foreign(ArchivedOrder.agent_id) == Agent.id', viewonly=True)
+    service = db.relationship('Service', primaryjoin='foreign(ArchivedOrder.service_id) == Service.id', viewonly=True)
+    photos = db.relationship('OrderPhoto', primaryjoin='foreign(OrderPhoto.order_id) == ArchivedOrder.id',
+                             order_by='OrderPhoto.id', viewonly=True)
+    
+    def to_dict(self, include_details=True):
+        """Convert archived order to dictionary (same shape as an order)"""
+        data = Order.to_dict(self, include_details)
+        data['archived_at'] = self.archived_at.isoformat() if self.archived_at else None
+        return data
+    
+    def __repr__(self):
+        return f'<ArchivedOrder {self.order_number} - {self.status}>'
+
+
+class ArchivedNotification(db.Model):
+    """Notification of an archived order"""
+    __table__ = db.Table(
+        'notifications_archive',
+        *archive_columns(Notification.__table__),
+        db.Index('ix_notifications_archive_order_id', 'order_id'),
+        db.Index('ix_notifications_archive_purge_created', 'body_purged_at', 'created_at'),
+        db.Index('ix_notifications_archive_created_at', 'created_at'),
+    )
+    
+    to_dict = Notification.to_dict
+
+
+class ArchivedPayment(db.Model):
+    """Payment of an archived order"""
+    __table__ = db.Table(
+        'payments_archive',
+        *archive_columns(Payment.__table__),
+        db.Index('ix_payments_archive_order_id', 'order_id'),
+    )
+    
+    to_dict = Payment.to_dict
@@ -0,0 +1,41 @@
+from datetime import datetime
+from src.database import db
+from src.models.money import to_dollars
+
+class MenuItem(db.Model):
+    """Priced item a service can buy on the customer's behalf (e.g. In-N-Out menu)"""
+    __tablename__ = 'menu_items'
+    __table_args__ = (
+        db.UniqueConstraint('service_id', 'sku', name='uq_menu_items_service_sku'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    sku = db.Column(db.String(50), nullable=False)  # e.g. 'double-double'
+    name = db.Column(db.String(100), nullable=False)
+    
+    # Pricing
+    price_cents = db.Column(db.Integer, nullable=False)
+    
+    is_active = db.Column(db.Boolean, default=True)
+    sort_order = db.Column(db.Integer, default=0)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    service = db.relationship('Service', backref=db.backref('menu_items', lazy='dynamic'))
+    
+    def to_dict(self):
+        """Convert menu item to dictionary"""
+        return {
+            'id': self.id,
+            'sku': self.sku,
+            'name': self.name,
+            'price': to_dollars(self.price_cents),
+            'is_active': self.is_active,
+        }
+    
+    def __repr__(self):
+        return f'<MenuItem {self.sku}>'
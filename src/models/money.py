@@ -0,0 +1,28 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Money is stored as integer cents (the *_cents columns), which is also what
+# Stripe takes. Dollars only appear at the edges: request input and JSON output.
+
+
+def to_cents(amount):
+    """Convert a dollar amount (Decimal, int, float or numeric str) to integer cents
+    
+    Rounds half up to the nearest cent. Raises ValueError for anything that
+    isn't a finite number.
+    """
+    try:
+        return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, OverflowError):
+        raise ValueError("Invalid amount")
+
+
+def to_dollars(cents):
+    """Integer cents as a JSON number of dollars (1250 -> 12.5)"""
+    return (cents or 0) / 100
+
+
+def format_dollars(cents):
+    """Integer cents as a display amount (1250 -> '12.50')"""
+    cents = cents or 0
+    sign = '-' if cents < 0 else ''
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
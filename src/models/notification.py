@@ -4,17 +4,25 @@ from src.database import db
 class Notification(db.Model):
     """Notification log for SMS/Email"""
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # At most one message per order and event - the claim that dedupes sends
+        db.UniqueConstraint('order_id', 'event_type', name='uq_notifications_order_event'),
+        # Retention: bodies still to purge, and rows past the delete cutoff, oldest first
+        db.Index('ix_notifications_purge_created', 'body_purged_at', 'created_at'),
+        db.Index('ix_notifications_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
-    # Relationships
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)
+    # Relationships (user_id is empty for guest checkout customers)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True, index=True)
     
     # Notification details
     type = db.Column(db.String(20), nullable=False)  # 'sms', 'email'
+    event_type = db.Column(db.String(50))  # e.g. 'order_confirmed', 'new_job:agent:12'
     subject = db.Column(db.String(255))
-    message = db.Column(db.Text, nullable=False)
+    message = db.Column(db.Text)  # emptied once past the body retention window
     
     # Delivery details
     recipient = db.Column(db.String(255), nullable=False)  # phone or email
@@ -32,6 +40,7 @@ class Notification(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     sent_at = db.Column(db.DateTime)
     failed_at = db.Column(db.DateTime)
+    body_purged_at = db.Column(db.DateTime)  # when subject/message were dropped
     
     # Relationships
     user = db.relationship('User', backref='notifications')
@@ -42,6 +51,7 @@ class Notification(db.Model):
         return {
             'id': self.id,
             'type': self.type,
+            'event_type': self.event_type,
             'subject': self.subject,
             'message': self.message,
             'recipient': self.recipient,
@@ -1,33 +1,60 @@
 from datetime import datetime
 from src.database import db
+from src.models.money import to_dollars
+
+# Predicate for the agent job board. Kept as SQL text so the same literal is
+# used by the partial index and by the query - planners can only match a
+# partial index when the query repeats its condition verbatim, not as a bind.
+AVAILABLE_ORDERS_WHERE = "status = 'pending' AND agent_id IS NULL"
 
 class Order(db.Model):
     """Order model for service requests"""
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Order history per customer/agent, optionally filtered by status, newest first
+        db.Index('ix_orders_customer_status_created', 'customer_id', 'status', 'created_at'),
+        db.Index('ix_orders_agent_status_created', 'agent_id', 'status', 'created_at'),
+        # Unassigned pending orders only - tiny compared to the whole table
+        db.Index(
+            'ix_orders_available_created',
+            'created_at',
+            postgresql_where=db.text(AVAILABLE_ORDERS_WHERE),
+            sqlite_where=db.text(AVAILABLE_ORDERS_WHERE)
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(20), unique=True, nullable=False, index=True)
     
-    # Relationships
-    customer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Relationships (customer_id is empty for guest checkout orders)
+    customer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     agent_id = db.Column(db.Integer, db.ForeignKey('agents.id'), nullable=True)
     service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
     
+    # Guest checkout (no account): contact details and the Stripe Checkout Session
+    guest_name = db.Column(db.String(100))
+    guest_phone = db.Column(db.String(20))
+    guest_email = db.Column(db.String(120))
+    checkout_session_id = db.Column(db.String(255), unique=True, index=True)
+    
     # Order details
     description = db.Column(db.Text, nullable=False)
     special_instructions = db.Column(db.Text)
+    line_items = db.Column(db.JSON)  # [{'sku', 'name', 'quantity', 'unit_amount' (cents)}]
     
     # Location
     pickup_address = db.Column(db.String(255))
     delivery_address = db.Column(db.String(255))
+    location_lat = db.Column(db.Float)  # where the job is, for dispatching nearby agents
+    location_lng = db.Column(db.Float)
     
-    # Status: 'pending', 'accepted', 'in_progress', 'completed', 'cancelled'
+    # Status: 'awaiting_payment', 'pending', 'accepted', 'in_progress', 'completed', 'cancelled'
     status = db.Column(db.String(20), default='pending', nullable=False, index=True)
     
-    # Pricing
-    service_fee = db.Column(db.Numeric(10, 2), nullable=False)  # Base fee
-    additional_costs = db.Column(db.Numeric(10, 2), default=0)  # Food, DMV fees, etc.
-    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    # Pricing, in integer cents
+    service_fee_cents = db.Column(db.Integer, nullable=False)  # Base fee
+    additional_costs_cents = db.Column(db.Integer, default=0)  # Food, DMV fees, etc.
+    total_amount_cents = db.Column(db.Integer, nullable=False)
     
     # Proof & Documentation
     completion_photos = db.Column(db.JSON)  # Array of photo URLs
@@ -36,6 +63,7 @@ class Order(db.Model):
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    paid_at = db.Column(db.DateTime)
     accepted_at = db.Column(db.DateTime)
     started_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
@@ -47,6 +75,8 @@ class Order(db.Model):
     service = db.relationship('Service', back_populates='orders')
     payment = db.relationship('Payment', back_populates='order', uselist=False)
     notifications = db.relationship('Notification', back_populates='order', lazy='dynamic')
+    photos = db.relationship('OrderPhoto', primaryjoin='foreign(OrderPhoto.order_id) == Order.id',
+                             order_by='OrderPhoto.id', viewonly=True)
     
     def to_dict(self, include_details=True):
         """Convert order to dictionary"""
@@ -54,9 +84,9 @@ class Order(db.Model):
             'id': self.id,
             'order_number': self.order_number,
             'status': self.status,
-            'service_fee': float(self.service_fee) if self.service_fee else 0,
-            'additional_costs': float(self.additional_costs) if self.additional_costs else 0,
-            'total_amount': float(self.total_amount) if self.total_amount else 0,
+            'service_fee': to_dollars(self.service_fee_cents),
+            'additional_costs': to_dollars(self.additional_costs_cents),
+            'total_amount': to_dollars(self.total_amount_cents),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
         }
@@ -70,6 +100,9 @@ class Order(db.Model):
                 'completion_photos': self.completion_photos or [],
                 'receipt_photos': self.receipt_photos or [],
                 'completion_notes': self.completion_notes,
+                'line_items': self.line_items or [],
+                'photos': [photo.to_dict() for photo in self.photos],
+                'paid_at': self.paid_at.isoformat() if self.paid_at else None,
                 'accepted_at': self.accepted_at.isoformat() if self.accepted_at else None,
                 'started_at': self.started_at.isoformat() if self.started_at else None,
                 'cancelled_at': self.cancelled_at.isoformat() if self.cancelled_at else None,
@@ -77,6 +110,12 @@ class Order(db.Model):
             
             if self.customer:
                 data['customer'] = self.customer.to_dict()
+            elif self.guest_name or self.guest_phone:
+                data['guest'] = {
+                    'name': self.guest_name,
+                    'phone': self.guest_phone,
+                    'email': self.guest_email,
+                }
             if self.agent:
                 data['agent'] = self.agent.to_dict()
             if self.service:
@@ -0,0 +1,37 @@
+from datetime import datetime
+from src.database import db
+
+class OrderEvent(db.Model):
+    """Append-only log of order lifecycle events
+    
+    Rows are only ever inserted, in the same transaction as the change they
+    record. seq increases monotonically across all orders, so a consumer can
+    read everything after the last seq it saw. No foreign key to orders, so
+    the history outlives archived or deleted orders.
+    """
+    __tablename__ = 'order_events'
+    __table_args__ = (
+        # An order's timeline is one range read
+        db.Index('ix_order_events_order_seq', 'order_id', 'seq'),
+        # Never reuse the seq of a deleted last row
+        {'sqlite_autoincrement': True},
+    )
+    
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(20), nullable=False)  # created, paid, accepted, started, completed, cancelled
+    data = db.Column(db.JSON)  # event details, e.g. {'reason': ...} for cancelled
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        """Convert order event to dictionary"""
+        return {
+            'seq': self.seq,
+            'order_id': self.order_id,
+            'event_type': self.event_type,
+            'data': self.data or {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<OrderEvent {self.seq} - order {self.order_id} {self.event_type}>'
@@ -0,0 +1,69 @@
+from datetime import datetime
+from src.database import db
+
+# Resized JPEG variants made for every photo: name -> longest side in pixels
+VARIANT_SIZES = {'thumb': 320, 'medium': 1280}
+
+class OrderPhoto(db.Model):
+    """Completion or receipt photo uploaded for an order
+    
+    Files are content-addressed: the original and its resized variants are
+    stored once per content hash, however many orders use the same image.
+    """
+    __tablename__ = 'order_photos'
+    __table_args__ = (
+        # The same image is only attached once per order and kind
+        db.UniqueConstraint('order_id', 'kind', 'content_hash', name='uq_order_photos_order_kind_hash'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False)  # no foreign key, so photos survive archiving
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    kind = db.Column(db.String(20), nullable=False)  # 'completion', 'receipt'
+    
+    # File
+    content_hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 hex
+    content_type = db.Column(db.String(50), nullable=False)
+    extension = db.Column(db.String(10), nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    
+    # Status: 'processing' (variants being made), 'ready', 'original_only'
+    status = db.Column(db.String(20), default='processing', nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def original_key(content_hash, extension):
+        return f"photos/{content_hash[:2]}/{content_hash}.{extension}"
+    
+    @staticmethod
+    def variant_key(content_hash, name):
+        return f"photos/{content_hash[:2]}/{content_hash}_{name}.jpg"
+    
+    def to_dict(self):
+        """Convert photo to dictionary; variants fall back to the original until ready"""
+        from src.services.media_storage import get_media_storage
+        
+        storage = get_media_storage()
+        url = storage.url(self.original_key(self.content_hash, self.extension))
+        variants = {
+            name: storage.url(self.variant_key(self.content_hash, name)) if self.status == 'ready' else url
+            for name in VARIANT_SIZES
+        }
+        
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'url': url,
+            'thumbnail_url': variants['thumb'],
+            'variants': variants,
+            'width': self.width,
+            'height': self.height,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<OrderPhoto {self.id} - order {self.order_id} {self.kind}>'
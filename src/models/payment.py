@@ -1,5 +1,6 @@
 from datetime import datetime
 from src.database import db
+from src.models.money import format_dollars, to_dollars
 
 class Payment(db.Model):
     """Payment transactions model"""
@@ -9,14 +10,14 @@ class Payment(db.Model):
     
     # Relationships
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     
     # Stripe details
     stripe_payment_intent_id = db.Column(db.String(100), unique=True)
     stripe_charge_id = db.Column(db.String(100))
     
     # Payment details
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount_cents = db.Column(db.Integer, nullable=False)
     currency = db.Column(db.String(3), default='usd')
     
     # Status: 'pending', 'processing', 'succeeded', 'failed', 'refunded'
@@ -27,7 +28,7 @@ class Payment(db.Model):
     last4 = db.Column(db.String(4))  # Last 4 digits of card
     
     # Refund details
-    refund_amount = db.Column(db.Numeric(10, 2), default=0)
+    refund_amount_cents = db.Column(db.Integer, default=0)
     refund_reason = db.Column(db.String(255))
     refunded_at = db.Column(db.DateTime)
     
@@ -46,12 +47,12 @@ class Payment(db.Model):
         return {
             'id': self.id,
             'order_id': self.order_id,
-            'amount': float(self.amount) if self.amount else 0,
+            'amount': to_dollars(self.amount_cents),
             'currency': self.currency,
             'status': self.status,
             'payment_method_type': self.payment_method_type,
             'last4': self.last4,
-            'refund_amount': float(self.refund_amount) if self.refund_amount else 0,
+            'refund_amount': to_dollars(self.refund_amount_cents),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'succeeded_at': self.succeeded_at.isoformat() if self.succeeded_at else None,
             'failed_at': self.failed_at.isoformat() if self.failed_at else None,
@@ -59,4 +60,4 @@ class Payment(db.Model):
         }
     
     def __repr__(self):
-        return f'<Payment {self.id} - ${self.amount} ({self.status})>'
+        return f'<Payment {self.id} - ${format_dollars(self.amount_cents)} ({self.status})>'
@@ -1,5 +1,6 @@
 from datetime import datetime
 from src.database import db
+from src.models.money import to_dollars
 
 class Service(db.Model):
     """Service types model"""
@@ -12,7 +13,7 @@ class Service(db.Model):
     tagline = db.Column(db.String(255))
     
     # Pricing
-    base_price = db.Column(db.Numeric(10, 2), nullable=False)
+    base_price_cents = db.Column(db.Integer, nullable=False)
     price_display = db.Column(db.String(50))  # e.g., "$10 + costs"
     
     # Service details
@@ -39,7 +40,7 @@ class Service(db.Model):
             'slug': self.slug,
             'description': self.description,
             'tagline': self.tagline,
-            'base_price': float(self.base_price) if self.base_price else 0,
+            'base_price': to_dollars(self.base_price_cents),
             'price_display': self.price_display,
             'icon': self.icon,
             'estimated_time': self.estimated_time,
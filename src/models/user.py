@@ -11,7 +11,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
-    phone = db.Column(db.String(20), nullable=False)
+    phone = db.Column(db.String(20), nullable=False, index=True)  # E.164, e.g. +15555551234
     
     # User role: 'customer', 'agent', 'admin'
     role = db.Column(db.String(20), nullable=False, default='customer')
@@ -0,0 +1,153 @@
+import cProfile
+import hashlib
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from flask import current_app, g, request
+
+# Signed profiling requests carry "X-Profile: <unix timestamp>.<hex hmac>",
+# where the HMAC-SHA256 of the timestamp is keyed with PROFILE_SECRET.
+PROFILE_HEADER = 'X-Profile'
+SIGNATURE_MAX_AGE = 300  # seconds
+
+# One profiled request per process at a time: cProfile allows a single active
+# profiler per interpreter (a second enable() raises on Python 3.12+)
+_profiler_lock = threading.Lock()
+
+
+def sign_profile_request(secret, timestamp=None):
+    """Build an X-Profile header value (for admin tooling)"""
+    timestamp = str(int(timestamp or time.time()))
+    signature = hmac.new(secret.encode('utf-8'), timestamp.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{signature}"
+
+
+def _valid_signature(header, secret):
+    timestamp, _, signature = header.partition('.')
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE:
+        return False
+    expected = sign_profile_request(secret, timestamp).partition('.')[2]
+    return hmac.compare_digest(expected, signature)
+
+
+class StackSampler:
+    """Sample one thread's Python stack on a timer and count collapsed stacks"""
+    
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+    
+    def write(self, path):
+        # Brendan Gregg's collapsed format, ready for flamegraph.pl / speedscope
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _should_profile():
+    config = current_app.config
+    header = request.headers.get(PROFILE_HEADER)
+    if header and config['PROFILE_SECRET']:
+        return _valid_signature(header, config['PROFILE_SECRET'])
+    return random.random() < config['PROFILE_SAMPLE_RATE']
+
+
+def _start_profiling():
+    if not _should_profile():
+        return
+    # Overlaps an already profiled request - serve it unprofiled
+    if not _profiler_lock.acquire(blocking=False):
+        return
+    
+    try:
+        if current_app.config['PROFILE_FORMAT'] == 'collapsed':
+            profiler = StackSampler(threading.get_ident(), current_app.config['PROFILE_INTERVAL'])
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+    except Exception as e:
+        # Profiling must never fail the request it observes
+        _profiler_lock.release()
+        print(f"Failed to start profiler: {str(e)}")
+        return
+    
+    g.profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.endpoint or 'unmatched'}-{uuid.uuid4().hex[:8]}"
+    g.profiler = profiler
+
+
+def _tag_response(response):
+    if 'profile_id' in g:
+        response.headers['X-Profile-Id'] = g.profile_id
+    return response
+
+
+def _finish_profiling(error=None):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    
+    try:
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+        else:
+            profiler.disable()
+    except Exception as e:
+        print(f"Failed to stop profiler: {str(e)}")
+        return
+    finally:
+        _profiler_lock.release()
+    
+    directory = current_app.config['PROFILE_DIR']
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if isinstance(profiler, StackSampler):
+            profiler.write(os.path.join(directory, f"{g.profile_id}.folded"))
+        else:
+            profiler.dump_stats(os.path.join(directory, f"{g.profile_id}.pstats"))
+    except Exception as e:
+        print(f"Failed to write profile: {str(e)}")
+
+
+def init_profiling(app):
+    """Profile signed or randomly sampled requests; no hooks at all when disabled"""
+    app.config.setdefault('PROFILE_SECRET', None)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_DIR', 'profiles')
+    app.config.setdefault('PROFILE_FORMAT', 'pstats')  # or 'collapsed'
+    app.config.setdefault('PROFILE_INTERVAL', 0.005)  # seconds between stack samples
+    
+    if not app.config['PROFILE_SECRET'] and not app.config['PROFILE_SAMPLE_RATE']:
+        return
+    
+    app.before_request(_start_profiling)
+    app.after_request(_tag_response)
+    app.teardown_request(_finish_profiling)
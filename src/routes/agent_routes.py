@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from src.services.auth_service import token_required, role_required
-from src.models.agent import Agent
+from src.services.agent_import_service import AgentImportService, import_format
+from src.models.agent import Agent, BACKGROUND_CHECK_STATUSES
+from src.models.money import to_dollars
 from src.database import db
 
 agent_bp = Blueprint('agents', __name__, url_prefix='/api/agents')
@@ -102,7 +104,7 @@ def get_agent_stats(current_user):
                 'cancelled_jobs': agent.cancelled_jobs,
                 'completion_rate': agent.completion_rate,
                 'average_rating': float(agent.average_rating) if agent.average_rating else 0,
-                'total_earnings': float(agent.total_earnings) if agent.total_earnings else 0,
+                'total_earnings': to_dollars(agent.total_earnings_cents),
             }
         }), 200
         
@@ -143,7 +145,7 @@ def update_background_check(current_user, agent_id):
         if 'status' not in data:
             return jsonify({'error': 'status field required'}), 400
         
-        if data['status'] not in ['pending', 'approved', 'rejected']:
+        if data['status'] not in BACKGROUND_CHECK_STATUSES:
             return jsonify({'error': 'Invalid status'}), 400
         
         agent.background_check_status = data['status']
@@ -161,3 +163,48 @@ def update_background_check(current_user, agent_id):
         
     except Exception as e:
         return jsonify({'error': 'Failed to update background check'}), 500
+
+
+def run_bulk_upload(apply):
+    """Run a bulk service function over the uploaded 'file' (multipart; optional 'format', 'dry_run')"""
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({'error': 'Missing required field: file'}), 400
+    
+    result = apply(
+        upload.stream,
+        import_format(upload.filename, request.form.get('format')),
+        batch_size=current_app.config['AGENT_IMPORT_BATCH_SIZE'],
+        dry_run=request.form.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    )
+    return jsonify(result), 200
+
+
+@agent_bp.route('/import', methods=['POST'])
+@token_required
+@role_required('admin')
+def import_agents(current_user):
+    """Create agents in bulk from a CSV/NDJSON file (admin only)"""
+    try:
+        return run_bulk_upload(AgentImportService.import_agents)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error importing agents: {str(e)}")
+        return jsonify({'error': 'Agent import failed'}), 500
+
+
+@agent_bp.route('/background-checks', methods=['POST'])
+@token_required
+@role_required('admin')
+def update_background_checks(current_user):
+    """Apply background check results in bulk from a CSV/NDJSON file (admin only)"""
+    try:
+        return run_bulk_upload(AgentImportService.apply_background_checks)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error updating background checks: {str(e)}")
+        return jsonify({'error': 'Failed to update background checks'}), 500
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from src.services.auth_service import AuthService, token_required
+from src.services.phone_numbers import to_e164
 from src.models.agent import Agent
 from src.database import db
 
@@ -98,7 +99,7 @@ def update_profile(current_user):
         if 'last_name' in data:
             current_user.last_name = data['last_name']
         if 'phone' in data:
-            current_user.phone = data['phone']
+            current_user.phone = to_e164(data['phone'])
         
         db.session.commit()
         
@@ -107,6 +108,8 @@ def update_profile(current_user):
             'user': current_user.to_dict()
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Profile update failed'}), 500
 
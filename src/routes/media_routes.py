@@ -0,0 +1,19 @@
+from flask import Blueprint, abort, send_from_directory
+from src.services.media_storage import LocalStorage, get_media_storage
+
+media_bp = Blueprint('media', __name__, url_prefix='/media')
+
+# Media keys are content hashes, so a URL's bytes never change
+MEDIA_MAX_AGE = 365 * 24 * 3600
+
+
+@media_bp.route('/<path:key>', methods=['GET'])
+def get_media(key):
+    """Serve a stored photo or variant (local storage only)"""
+    storage = get_media_storage()
+    if not isinstance(storage, LocalStorage):
+        abort(404)
+    
+    response = send_from_directory(storage.root, key, max_age=MEDIA_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
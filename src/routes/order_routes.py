@@ -1,13 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy.orm import selectinload
+from werkzeug.exceptions import RequestEntityTooLarge
 from src.services.auth_service import token_required, role_required
 from src.services.order_service import OrderService
 from src.services.stripe_service import StripeService
 from src.services.twilio_service import TwilioService
+from src.services.media_service import MediaService
 from src.models.order import Order
+from src.models.money import to_cents
 from src.models.service import Service
 
 order_bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
+MAX_EVENT_PAGE = 1000  # events per incremental read
+PHOTO_UPLOAD_STATUSES = ('accepted', 'in_progress', 'completed')
+
 @order_bp.route('/', methods=['POST'])
 @token_required
 def create_order(current_user):
@@ -28,7 +35,9 @@ def create_order(current_user):
             description=data['description'],
             pickup_address=data.get('pickup_address'),
             delivery_address=data.get('delivery_address'),
-            special_instructions=data.get('special_instructions')
+            special_instructions=data.get('special_instructions'),
+            location_lat=data.get('latitude'),
+            location_lng=data.get('longitude')
         )
         
         # Create payment intent
@@ -67,7 +76,7 @@ def get_orders(current_user):
                 return jsonify({'error': 'Agent profile not found'}), 404
             orders = OrderService.get_agent_orders(current_user.agent_profile.id, status)
         elif current_user.role == 'admin':
-            query = Order.query
+            query = Order.query.options(selectinload(Order.photos))
             if status:
                 query = query.filter_by(status=status)
             orders = query.order_by(Order.created_at.desc()).all()
@@ -88,7 +97,7 @@ def get_orders(current_user):
 def get_order(current_user, order_id):
     """Get specific order details"""
     try:
-        order = Order.query.get(order_id)
+        order = OrderService.get_order(order_id)
         
         if not order:
             return jsonify({'error': 'Order not found'}), 404
@@ -108,6 +117,54 @@ def get_order(current_user, order_id):
         return jsonify({'error': 'Failed to retrieve order'}), 500
 
 
+@order_bp.route('/<int:order_id>/timeline', methods=['GET'])
+@token_required
+def get_order_timeline(current_user, order_id):
+    """Get an order's full event history"""
+    try:
+        order = OrderService.get_order(order_id)
+        
+        if not order:
+            return jsonify({'error': 'Order not found'}), 404
+        
+        # Check permissions
+        if current_user.role == 'customer' and order.customer_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        elif current_user.role == 'agent':
+            if not current_user.agent_profile or order.agent_id != current_user.agent_profile.id:
+                return jsonify({'error': 'Unauthorized'}), 403
+        
+        events = OrderService.get_order_timeline(order_id)
+        
+        return jsonify({
+            'order_id': order_id,
+            'events': [event.to_dict() for event in events]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to retrieve order timeline'}), 500
+
+
+@order_bp.route('/events', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_order_events(current_user):
+    """Read the event log incrementally: pass the last seq seen as ?after="""
+    try:
+        after = request.args.get('after', 0, type=int)
+        limit = min(request.args.get('limit', 500, type=int), MAX_EVENT_PAGE)
+        
+        events = OrderService.get_events_after(after, limit)
+        
+        return jsonify({
+            'events': [event.to_dict() for event in events],
+            'next_after': events[-1].seq if events else after
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to retrieve order events'}), 500
+
+
 @order_bp.route('/available', methods=['GET'])
 @token_required
 @role_required('agent')
@@ -179,7 +236,7 @@ def complete_order(current_user, order_id):
             completion_notes=data.get('completion_notes'),
             completion_photos=data.get('completion_photos', []),
             receipt_photos=data.get('receipt_photos', []),
-            additional_costs=data.get('additional_costs', 0)
+            additional_costs_cents=to_cents(data.get('additional_costs') or 0)
         )
         
         return jsonify({
@@ -194,6 +251,48 @@ def complete_order(current_user, order_id):
         return jsonify({'error': 'Failed to complete order'}), 500
 
 
+@order_bp.route('/<int:order_id>/photos', methods=['POST'])
+@token_required
+@role_required('agent')
+def upload_order_photos(current_user, order_id):
+    """Upload completion/receipt photos (multipart: one or more 'photo' files, 'kind')"""
+    try:
+        # Werkzeug enforces this while parsing, chunked bodies included
+        request.max_content_length = current_app.config['MAX_PHOTO_UPLOAD_BYTES']
+        
+        order = Order.query.get(order_id)
+        if not order:
+            return jsonify({'error': 'Order not found'}), 404
+        if not current_user.agent_profile or order.agent_id != current_user.agent_profile.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        if order.status not in PHOTO_UPLOAD_STATUSES:
+            return jsonify({'error': f"Photos can't be added to an order that is {order.status}"}), 400
+        
+        uploads = request.files.getlist('photo')
+        if not uploads:
+            return jsonify({'error': 'Missing required field: photo'}), 400
+        
+        photos = []
+        for upload in uploads:
+            photo, created = MediaService.add_order_photo(
+                order_id, request.form.get('kind', 'completion'), upload, uploaded_by=current_user.id
+            )
+            photos.append(dict(photo.to_dict(), duplicate=not created))
+        
+        return jsonify({
+            'message': 'Photos uploaded successfully',
+            'photos': photos
+        }), 201
+        
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'Upload is too large'}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error uploading photos: {str(e)}")
+        return jsonify({'error': 'Photo upload failed'}), 500
+
+
 @order_bp.route('/<int:order_id>/cancel', methods=['POST'])
 @token_required
 def cancel_order(current_user, order_id):
@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from src.services.auth_service import token_required, role_required
 from src.services.stripe_service import StripeService
+from src.services.pricing_service import PricingService
+from src.middleware.compression import precompressed_response
 from src.models.payment import Payment
+from src.models.archive import ArchivedPayment
+from src.models.money import to_cents, to_dollars
 from src.models.service import Service
 
 payment_bp = Blueprint('payments', __name__, url_prefix='/api/payments')
@@ -29,7 +33,7 @@ def stripe_webhook():
 def get_payment(current_user, payment_id):
     """Get payment details"""
     try:
-        payment = Payment.query.get(payment_id)
+        payment = Payment.query.get(payment_id) or ArchivedPayment.query.get(payment_id)
         
         if not payment:
             return jsonify({'error': 'Payment not found'}), 404
@@ -56,7 +60,7 @@ def refund_payment(current_user, payment_id):
         
         refund = StripeService.create_refund(
             payment_id=payment_id,
-            amount=data.get('amount'),
+            amount_cents=to_cents(data['amount']) if data.get('amount') is not None else None,
             reason=data.get('reason')
         )
         
@@ -64,7 +68,7 @@ def refund_payment(current_user, payment_id):
             'message': 'Refund processed successfully',
             'refund': {
                 'id': refund.id,
-                'amount': refund.amount / 100,
+                'amount': to_dollars(refund.amount),
                 'status': refund.status
             }
         }), 200
@@ -79,15 +83,18 @@ def refund_payment(current_user, payment_id):
 # Service routes
 service_bp = Blueprint('services', __name__, url_prefix='/api/services')
 
+MAX_QUOTE_CARTS = 100
+
 @service_bp.route('/', methods=['GET'])
 def get_services():
     """Get all active services"""
     try:
-        services = Service.query.filter_by(is_active=True).order_by(Service.sort_order).all()
+        def build_catalog():
+            services = Service.query.filter_by(is_active=True).order_by(Service.sort_order).all()
+            return {'services': [service.to_dict() for service in services]}
         
-        return jsonify({
-            'services': [service.to_dict() for service in services]
-        }), 200
+        # The catalog rarely changes - serialise and compress it once per TTL
+        return precompressed_response('services:active', build_catalog)
         
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve services'}), 500
@@ -108,3 +115,39 @@ def get_service(slug):
         
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve service'}), 500
+
+
+@service_bp.route('/<slug>/menu', methods=['GET'])
+def get_service_menu(slug):
+    """Get a service's menu with server-side prices (in cents)"""
+    try:
+        return jsonify({
+            'service': slug,
+            'items': PricingService.get_menu(slug),
+            'price_version': PricingService.get_price_table().version
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to retrieve menu'}), 500
+
+
+@service_bp.route('/quote', methods=['POST'])
+def quote_carts():
+    """Price one cart or a batch of carts"""
+    try:
+        data = request.get_json() or {}
+        
+        if 'carts' not in data:
+            return jsonify({'quote': PricingService.quote(data)}), 200
+        
+        carts = data['carts']
+        if not isinstance(carts, list) or len(carts) > MAX_QUOTE_CARTS:
+            return jsonify({'error': f'carts must be a list of at most {MAX_QUOTE_CARTS}'}), 400
+        
+        return jsonify({'quotes': PricingService.quote_many(carts)}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Quote error: {str(e)}")
+        return jsonify({'error': 'Failed to price cart'}), 500
@@ -1,34 +1,37 @@
 import os
-import stripe
 from datetime import datetime
 from flask import Blueprint, request, jsonify
-from twilio.rest import Client
+from src.database import db
+from src.models.order import Order
+from src.models.money import to_dollars
+from src.services.clients import get_stripe, get_twilio_client
+from src.services.order_service import OrderService
+from src.services.pricing_service import PricingService
+from src.services.shared_store import get_shared_store
+from src.services.phone_numbers import to_e164
+from src.middleware.read_replicas import primary_only
+from src.metrics import external_call
 
 simple_order_bp = Blueprint('simple_orders', __name__, url_prefix='/api/orders')
 
-# Initialize Stripe
-stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://go4me-ar7jjn.manus.space')
-
-# Initialize Twilio
-twilio_client = Client(
-    os.getenv('TWILIO_ACCOUNT_SID'),
-    os.getenv('TWILIO_AUTH_TOKEN')
-)
 TWILIO_PHONE = os.getenv('TWILIO_PHONE_NUMBER')
+SUCCESS_FETCH_INTERVAL = 10  # seconds between Stripe fallback fetches per session
 
 def send_sms(to_phone, message):
     """Send SMS via Twilio"""
+    twilio_client = get_twilio_client()
+    if not twilio_client:
+        print("Twilio not configured - SMS not sent")
+        return False
+    
     try:
-        # Format phone number
-        if not to_phone.startswith('+'):
-            to_phone = '+1' + to_phone.replace('-', '').replace('(', '').replace(')', '').replace(' ', '')
-        
-        message = twilio_client.messages.create(
-            body=message,
-            from_=TWILIO_PHONE,
-            to=to_phone
-        )
+        with external_call('twilio', 'messages.create'):
+            message = twilio_client.messages.create(
+                body=message,
+                from_=TWILIO_PHONE,
+                to=to_phone
+            )
         print(f"SMS sent successfully to {to_phone}: {message.sid}")
         return True
     except Exception as e:
@@ -41,72 +44,117 @@ def create_order():
     try:
         data = request.get_json()
         
-        # Calculate total price
-        if data.get('service') == 'innout':
-            # Calculate food total
-            food_total = 0
-            for item in data.get('innoutOrder', []):
-                food_total += item['price'] * item['quantity']
-            
-            total = food_total + 10  # $10 delivery fee
-            service_name = "In-N-Out Delivery"
-            
-        else:
-            # Other services - fixed pricing
-            service_prices = {
-                'dmv': 95,
-                'eyes-on': 60,
-                'lost-found': 40,
-                'dry-cleaning': 15,
-                'custom': 50  # Default for custom
-            }
-            total = service_prices.get(data.get('service'), 50)
-            service_name = data.get('service', 'Service').replace('-', ' ').title()
+        # Prices come from the server-side price table; client prices are ignored
+        quote = PricingService.quote({
+            'service': data.get('service') or 'custom',
+            'items': data.get('innoutOrder', [])
+        })
+        delivery_address = ' '.join(
+            part for part in (data.get('street'), data.get('city'), data.get('state'), data.get('zip')) if part
+        )
         
-        # Create Stripe Checkout Session
-        checkout_session = stripe.checkout.Session.create(
-            payment_method_types=['card'],
-            line_items=[{
+        # Persist first so the checkout session can point back at the order
+        order = OrderService.create_guest_order(
+            service_slug=quote['service'],
+            customer_name=data.get('name', ''),
+            customer_phone=to_e164(data.get('phone')),
+            description=data.get('description') or quote['service_name'],
+            line_items=quote['line_items'],
+            service_fee_cents=quote['service_fee_cents'],
+            additional_costs_cents=quote['items_total_cents'],
+            delivery_address=delivery_address or None,
+            location_lat=data.get('latitude'),
+            location_lng=data.get('longitude')
+        )
+        order_id, order_number = order.id, order.order_number
+        # Commit before calling Stripe so no transaction or pooled connection spans the network call
+        db.session.commit()
+        
+        # Itemise the checkout: the service fee plus anything bought for the customer
+        checkout_items = [{
+            'price_data': {
+                'currency': quote['currency'],
+                'product_data': {
+                    'name': f"Go4me.ai - {quote['service_name']}",
+                    'description': f"Order for {data.get('name', 'Customer')}",
+                },
+                'unit_amount': quote['service_fee_cents'],
+            },
+            'quantity': 1,
+        }]
+        for item in quote['line_items']:
+            checkout_items.append({
                 'price_data': {
-                    'currency': 'usd',
-                    'product_data': {
-                        'name': f"Go4me.ai - {service_name}",
-                        'description': f"Order for {data.get('name', 'Customer')}",
-                    },
-                    'unit_amount': int(total * 100),  # Convert to cents
+                    'currency': quote['currency'],
+                    'product_data': {'name': item['name']},
+                    'unit_amount': item['unit_amount'],
                 },
-                'quantity': 1,
-            }],
-            mode='payment',
-            success_url=f"{FRONTEND_URL}/success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{FRONTEND_URL}/new-task",
-            metadata={
-                'customer_name': data.get('name', ''),
-                'customer_phone': data.get('phone', ''),
-                'service': data.get('service', ''),
-                'delivery_address': f"{data.get('street', '')} {data.get('city', '')} {data.get('state', '')} {data.get('zip', '')}",
-                'order_data': str(data)  # Store full order data
-            }
-        )
+                'quantity': item['quantity'],
+            })
+        
+        # Create Stripe Checkout Session
+        stripe = get_stripe()
+        try:
+            with external_call('stripe', 'checkout.session.create'):
+                checkout_session = stripe.checkout.Session.create(
+                    payment_method_types=['card'],
+                    line_items=checkout_items,
+                    mode='payment',
+                    success_url=f"{FRONTEND_URL}/success?session_id={{CHECKOUT_SESSION_ID}}",
+                    cancel_url=f"{FRONTEND_URL}/new-task",
+                    client_reference_id=order_number,
+                    metadata={
+                        'order_id': order_id,
+                        'order_number': order_number,
+                        'price_version': quote['price_version']
+                    }
+                )
+        except Exception:
+            # The order can never be paid; don't leave it awaiting payment
+            try:
+                OrderService.cancel_order(order_id, reason='Checkout could not be started')
+            except Exception as e:
+                print(f"Failed to cancel order {order_number}: {str(e)}")
+            raise
         
-        # TODO: Save order to database here
-        # For now, just return the checkout URL
+        Order.query.filter_by(id=order_id).update(
+            {'checkout_session_id': checkout_session.id}, synchronize_session=False
+        )
+        db.session.commit()
         
         return jsonify({
             'success': True,
             'checkout_url': checkout_session.url,
             'session_id': checkout_session.id,
-            'total': total
+            'order_number': order_number,
+            'total': to_dollars(quote['total_cents'])
         }), 200
         
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
+        db.session.rollback()
         print(f"Error creating order: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def _claim_checkout_fetch(session_id):
+    """True if this request should ask Stripe for the session (once per window per session)"""
+    try:
+        return get_shared_store().set_if_absent(f"checkout-fetch:{session_id}", '1', SUCCESS_FETCH_INTERVAL)
+    except Exception as e:
+        # Without the store there's no throttle - a single fetch beats failing the page
+        print(f"Checkout fetch throttle unavailable: {str(e)}")
+        return True
+
 @simple_order_bp.route('/success', methods=['GET'])
+@primary_only
 def order_success():
     """Handle successful payment"""
     session_id = request.args.get('session_id')
@@ -115,27 +163,23 @@ def order_success():
         return jsonify({'error': 'No session ID provided'}), 400
     
     try:
-        # Retrieve the session from Stripe
-        session = stripe.checkout.Session.retrieve(session_id)
+        order = Order.query.filter_by(checkout_session_id=session_id).first()
+        if not order:
+            return jsonify({'error': 'Order not found'}), 404
         
-        # Send confirmation SMS to customer
-        if session.payment_status == 'paid':
-            customer_phone = session.metadata.get('customer_phone')
-            customer_name = session.metadata.get('customer_name', 'Customer')
-            service = session.metadata.get('service', 'service')
-            
-            if customer_phone:
-                message = f"🎉 Order confirmed! Hi {customer_name}, your {service} order has been received and a gopher will be assigned shortly. Track your order at: {FRONTEND_URL}/tracking"
-                send_sms(customer_phone, message)
-                
-                # TODO: Notify available gophers about new order
-                # For now, we'll just log it
-                print(f"New order ready for gopher assignment: {session_id}")
+        # Normally the checkout.session.completed webhook has already recorded
+        # payment. If it hasn't arrived yet, ask Stripe once per short window
+        # rather than on every page load.
+        if not order.paid_at and _claim_checkout_fetch(session_id):
+            with external_call('stripe', 'checkout.session.retrieve'):
+                session = get_stripe().checkout.Session.retrieve(session_id)
+            order = OrderService.confirm_checkout(session)
         
         return jsonify({
             'success': True,
-            'payment_status': session.payment_status,
-            'customer_email': session.customer_details.email if session.customer_details else None
+            'payment_status': 'paid' if order.paid_at else 'unpaid',
+            'customer_email': order.guest_email,
+            'order_number': order.order_number
         }), 200
         
     except Exception as e:
@@ -152,6 +196,11 @@ def notify_gopher():
         if not gopher_phone:
             return jsonify({'error': 'Gopher phone number required'}), 400
         
+        try:
+            gopher_phone = to_e164(gopher_phone)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         message = f"🚀 New Go4me.ai run available! {order_details}. Accept in the app to start earning!"
         
         if send_sms(gopher_phone, message):
@@ -0,0 +1,31 @@
+from flask import after_this_request, current_app, has_request_context
+
+
+def call_after_response(fn, *args):
+    """Run fn(*args) once the current response has been sent, in a fresh app context
+    
+    For follow-up work a caller shouldn't wait for, such as SMS after a Stripe
+    webhook: the WSGI server calls it when it closes the response. Outside a
+    request (CLI, tests) fn runs right away. Errors are logged, never raised.
+    """
+    if not has_request_context():
+        _run(fn, args)
+        return
+    
+    app = current_app._get_current_object()
+    
+    def run():
+        with app.app_context():
+            _run(fn, args)
+    
+    @after_this_request
+    def defer(response):
+        response.call_on_close(run)
+        return response
+
+
+def _run(fn, args):
+    try:
+        fn(*args)
+    except Exception as e:
+        print(f"Deferred {fn.__name__} failed: {str(e)}")
@@ -0,0 +1,310 @@
+import csv
+import io
+import json
+import os
+import secrets
+from datetime import datetime, timezone
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+from src.models.agent import Agent, BACKGROUND_CHECK_STATUSES
+from src.models.user import User
+from src.services.phone_numbers import to_e164
+from src.database import db
+
+IMPORT_FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+MAX_REPORTED_ERRORS = 1000  # later row errors are only counted
+
+
+def import_format(filename, requested=None):
+    """'csv' or 'ndjson', from an explicit choice or the file extension"""
+    if requested:
+        if requested not in IMPORT_FORMATS.values():
+            raise ValueError("Format must be csv or ndjson")
+        return requested
+    
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise ValueError("Unsupported file type - upload a .csv or .ndjson file")
+    return IMPORT_FORMATS[extension]
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict, error) from a binary CSV/NDJSON stream, one row at a time"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, None, "Too many columns"
+                else:
+                    yield reader.line_num, row, None
+        except csv.Error as e:
+            raise ValueError(f"Unreadable CSV at line {reader.line_num}: {e}")
+        return
+    
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON"
+            continue
+        if isinstance(row, dict):
+            yield line_number, row, None
+        else:
+            yield line_number, None, "Each line must be a JSON object"
+
+
+def field(row, name, max_length=None, required=False):
+    """A stripped string field; raises ValueError if missing or too long"""
+    value = row.get(name)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"Missing required field: {name}")
+    if max_length and len(value) > max_length:
+        raise ValueError(f"{name} is longer than {max_length} characters")
+    return value or None
+
+
+def parse_checked_at(value):
+    """ISO-8601 date/time as naive UTC, like the rest of the schema"""
+    try:
+        checked_at = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError("Invalid checked_at - use an ISO-8601 date")
+    if checked_at.tzinfo:
+        checked_at = checked_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return checked_at
+
+
+class AgentImportService:
+    """Create agents and apply background-check results from CSV/NDJSON files
+    
+    Rows are parsed and validated as they stream in and written a chunk per
+    transaction with one multi-row statement, so a file of thousands of
+    agents costs a few round trips per chunk. A bad row is reported with its
+    line number and skipped; it never aborts the rest of the file.
+    """
+    
+    @staticmethod
+    def new_result(dry_run):
+        """Counts and errors reported back for one file"""
+        return {'rows': 0, 'applied': 0, 'failed': 0, 'errors': [], 'dry_run': dry_run}
+    
+    @staticmethod
+    def record_error(result, line_number, message):
+        """Count a rejected row, keeping the first MAX_REPORTED_ERRORS messages"""
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': line_number, 'error': str(message)})
+    
+    @staticmethod
+    def validated_rows(stream, fmt, validate, result):
+        """Yield (line number, values) for rows that pass validate; record the rest"""
+        for line_number, row, error in read_rows(stream, fmt):
+            result['rows'] += 1
+            try:
+                if error:
+                    raise ValueError(error)
+                values = validate(row)
+            except ValueError as e:
+                AgentImportService.record_error(result, line_number, e)
+                continue
+            yield line_number, values
+    
+    @staticmethod
+    def in_chunks(rows, size):
+        """Group an iterator into lists of up to size items"""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    # Agent creation
+    
+    @staticmethod
+    def validate_agent_row(row):
+        """Columns: email, first_name, last_name, phone; optional bio, password"""
+        email = field(row, 'email', 120, required=True)
+        if '@' not in email:
+            raise ValueError("Invalid email address")
+        
+        return {
+            'email': email,
+            'first_name': field(row, 'first_name', 50, required=True),
+            'last_name': field(row, 'last_name', 50, required=True),
+            'phone': to_e164(field(row, 'phone', required=True)),
+            'bio': field(row, 'bio'),
+            'password': field(row, 'password'),
+        }
+    
+    @staticmethod
+    def import_agents(stream, fmt='csv', batch_size=500, dry_run=False):
+        """Create a user and a pending agent profile per row
+        
+        Agents without a password column get an unusable one; they can't log
+        in until a password is set for them. Returns the counts and per-line
+        errors.
+        """
+        result = AgentImportService.new_result(dry_run)
+        # One hash of a secret nobody knows, instead of a slow hash per row
+        no_password_hash = generate_password_hash(secrets.token_urlsafe(32))
+        seen = set()
+        
+        def validate(row):
+            agent = AgentImportService.validate_agent_row(row)
+            if agent['email'] in seen:
+                raise ValueError("Duplicate email in file")
+            seen.add(agent['email'])
+            return agent
+        
+        rows = AgentImportService.validated_rows(stream, fmt, validate, result)
+        for chunk in AgentImportService.in_chunks(rows, batch_size):
+            AgentImportService.create_agents(chunk, result, no_password_hash, dry_run)
+        result['errors'].sort(key=lambda error: error['line'])
+        return result
+    
+    @staticmethod
+    def create_agents(chunk, result, no_password_hash, dry_run):
+        """Insert one chunk of validated agents in a single transaction"""
+        emails = [agent['email'] for _, agent in chunk]
+        taken = {email for (email,) in db.session.query(User.email).filter(User.email.in_(emails))}
+        
+        new_agents = []
+        for line_number, agent in chunk:
+            if agent['email'] in taken:
+                AgentImportService.record_error(result, line_number, "Email already registered")
+            else:
+                new_agents.append((line_number, agent))
+        
+        if dry_run:
+            result['applied'] += len(new_agents)
+        if dry_run or not new_agents:
+            return
+        
+        users = [{
+            'email': agent['email'],
+            'first_name': agent['first_name'],
+            'last_name': agent['last_name'],
+            'phone': agent['phone'],
+            'role': 'agent',
+            'password_hash': generate_password_hash(agent['password']) if agent['password'] else no_password_hash,
+        } for _, agent in new_agents]
+        
+        try:
+            user_ids = dict(db.session.execute(
+                insert(User).returning(User.email, User.id), users
+            ).all())
+            db.session.execute(insert(Agent), [{
+                'user_id': user_ids[agent['email']],
+                'bio': agent['bio'] or '',
+                'is_available': False,
+                'background_check_status': 'pending',
+            } for _, agent in new_agents])
+            db.session.commit()
+            result['applied'] += len(new_agents)
+        except IntegrityError:
+            # Someone registered one of these emails meanwhile - go row by row
+            db.session.rollback()
+            for (line_number, agent), user in zip(new_agents, users):
+                try:
+                    user_id = db.session.execute(insert(User).returning(User.id), user).scalar_one()
+                    db.session.execute(insert(Agent).values(
+                        user_id=user_id, bio=agent['bio'] or '', is_available=False,
+                        background_check_status='pending'
+                    ))
+                    db.session.commit()
+                    result['applied'] += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    AgentImportService.record_error(result, line_number, "Email already registered")
+    
+    # Background checks
+    
+    @staticmethod
+    def validate_check_row(row):
+        """Columns: agent_id or email, status; optional checked_at"""
+        agent_id = field(row, 'agent_id')
+        email = field(row, 'email', 120)
+        if not agent_id and not email:
+            raise ValueError("Missing required field: agent_id or email")
+        if agent_id and not agent_id.isdigit():
+            raise ValueError("Invalid agent_id")
+        
+        status = field(row, 'status', required=True).lower()
+        if status not in BACKGROUND_CHECK_STATUSES:
+            raise ValueError(f"Invalid status - must be one of: {', '.join(BACKGROUND_CHECK_STATUSES)}")
+        
+        checked_at = field(row, 'checked_at')
+        return {
+            'agent_id': int(agent_id) if agent_id else None,
+            'email': email,
+            'status': status,
+            'checked_at': parse_checked_at(checked_at) if checked_at else None,
+        }
+    
+    @staticmethod
+    def apply_background_checks(stream, fmt='csv', batch_size=500, dry_run=False):
+        """Set background_check_status for the agents in the file
+        
+        Like the single-agent endpoint, approval stamps background_check_date
+        (checked_at when given, otherwise now). Returns the counts and
+        per-line errors.
+        """
+        result = AgentImportService.new_result(dry_run)
+        seen = set()
+        
+        rows = AgentImportService.validated_rows(stream, fmt, AgentImportService.validate_check_row, result)
+        for chunk in AgentImportService.in_chunks(rows, batch_size):
+            AgentImportService.update_checks(chunk, result, seen, dry_run)
+        result['errors'].sort(key=lambda error: error['line'])
+        return result
+    
+    @staticmethod
+    def update_checks(chunk, result, seen, dry_run):
+        """Resolve one chunk to agent ids and update them in a single transaction"""
+        ids = [check['agent_id'] for _, check in chunk if check['agent_id']]
+        emails = [check['email'] for _, check in chunk if not check['agent_id']]
+        known_ids = {agent_id for (agent_id,) in db.session.query(Agent.id).filter(Agent.id.in_(ids))} if ids else set()
+        ids_by_email = dict(db.session.query(User.email, Agent.id).join(
+            Agent, Agent.user_id == User.id
+        ).filter(User.email.in_(emails)).all()) if emails else {}
+        
+        now = datetime.utcnow()
+        updates = []
+        for line_number, check in chunk:
+            agent_id = check['agent_id'] if check['agent_id'] in known_ids else ids_by_email.get(check['email'])
+            if agent_id is None:
+                AgentImportService.record_error(result, line_number, "Agent not found")
+                continue
+            if agent_id in seen:
+                AgentImportService.record_error(result, line_number, "Duplicate agent in file")
+                continue
+            seen.add(agent_id)
+            
+            values = {'id': agent_id, 'background_check_status': check['status']}
+            if check['status'] == 'approved':
+                values['background_check_date'] = check['checked_at'] or now
+            updates.append(values)
+        
+        if dry_run:
+            result['applied'] += len(updates)
+        if dry_run or not updates:
+            return
+        
+        try:
+            # ORM bulk UPDATE by primary key: one executemany per chunk
+            db.session.execute(update(Agent), updates)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        result['applied'] += len(updates)
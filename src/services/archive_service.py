@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import and_, literal, or_, select
+from src.models.order import Order
+from src.models.notification import Notification
+from src.models.payment import Payment
+from src.models.archive import ArchivedOrder, ArchivedNotification, ArchivedPayment
+from src.database import db
+
+
+class ArchiveService:
+    """Move finished orders out of the hot tables into the archive tables"""
+    
+    @staticmethod
+    def archivable_order_ids(cutoff, limit):
+        """Oldest completed/cancelled orders that finished before cutoff"""
+        return [order_id for (order_id,) in db.session.query(Order.id).filter(or_(
+            and_(Order.status == 'completed', Order.completed_at < cutoff),
+            and_(Order.status == 'cancelled', Order.cancelled_at < cutoff)
+        )).order_by(Order.id).limit(limit)]
+    
+    @staticmethod
+    def move_rows(model, archive_model, ids, archived_at):
+        """Copy rows by primary key into the archive, then delete them (caller commits)"""
+        if not ids:
+            return
+        
+        hot = model.__table__
+        db.session.execute(archive_model.__table__.insert().from_select(
+            [column.name for column in hot.columns] + ['archived_at'],
+            select(*hot.columns, literal(archived_at, db.DateTime)).where(hot.c.id.in_(ids))
+        ))
+        db.session.execute(hot.delete().where(hot.c.id.in_(ids)))
+    
+    @staticmethod
+    def archive_batch(order_ids):
+        """Archive orders with their notifications and payments in one short transaction"""
+        now = datetime.utcnow()
+        try:
+            # Children by id, so only rows that were copied get deleted
+            notification_ids = [row_id for (row_id,) in db.session.query(Notification.id).filter(
+                Notification.order_id.in_(order_ids)
+            )]
+            payment_ids = [row_id for (row_id,) in db.session.query(Payment.id).filter(
+                Payment.order_id.in_(order_ids)
+            )]
+            
+            ArchiveService.move_rows(Notification, ArchivedNotification, notification_ids, now)
+            ArchiveService.move_rows(Payment, ArchivedPayment, payment_ids, now)
+            ArchiveService.move_rows(Order, ArchivedOrder, order_ids, now)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    @staticmethod
+    def archive_orders(older_than_days, batch_size=500, max_batches=None, pause=0, progress=None):
+        """Archive every order finished more than older_than_days ago, batch by batch
+        
+        Each batch is its own transaction, so locks are held for one batch at
+        a time; pause (seconds) between batches eases the load on replicas.
+        Returns the number of orders archived.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        archived = 0
+        batches = 0
+        
+        while max_batches is None or batches < max_batches:
+            order_ids = ArchiveService.archivable_order_ids(cutoff, batch_size)
+            if not order_ids:
+                break
+            
+            ArchiveService.archive_batch(order_ids)
+            archived += len(order_ids)
+            batches += 1
+            if progress:
+                progress(archived)
+            
+            if len(order_ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        
+        return archived
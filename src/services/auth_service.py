@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify
 from src.models.user import User
+from src.services.phone_numbers import to_e164
 from src.database import db
 
 JWT_SECRET = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
@@ -38,6 +39,18 @@ class AuthService:
         except jwt.InvalidTokenError:
             raise ValueError("Invalid token")
     
+    @staticmethod
+    def user_id_from_request():
+        """User ID from a valid bearer token, without touching the database"""
+        parts = request.headers.get('Authorization', '').split(' ')
+        if len(parts) != 2:
+            return None
+        
+        try:
+            return AuthService.decode_token(parts[1]).get('user_id')
+        except ValueError:
+            return None
+    
     @staticmethod
     def register_user(email, password, first_name, last_name, phone, role='customer'):
         """Register a new user"""
@@ -51,7 +64,7 @@ class AuthService:
             email=email,
             first_name=first_name,
             last_name=last_name,
-            phone=phone,
+            phone=to_e164(phone),
             role=role
         )
         user.set_password(password)
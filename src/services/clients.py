@@ -0,0 +1,74 @@
+import importlib.util
+import os
+import threading
+
+# SDK clients are built on first use rather than at import, so worker boot
+# doesn't pay for importing Stripe or constructing Twilio's HTTP client.
+_lock = threading.Lock()
+_twilio_client = None
+_stripe = None
+
+TWILIO_TIMEOUT = float(os.getenv('TWILIO_TIMEOUT', 10))  # seconds per HTTP request
+TWILIO_MAX_RETRIES = int(os.getenv('TWILIO_MAX_RETRIES', 1))  # connection failures only
+TWILIO_POOL_SIZE = int(os.getenv('TWILIO_POOL_SIZE', 10))  # keep-alive connections per worker
+
+
+def get_twilio_client():
+    """Return the shared Twilio client, or None if Twilio is not configured"""
+    global _twilio_client
+    
+    if _twilio_client is None:
+        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+        if not account_sid or not auth_token:
+            return None
+        
+        with _lock:
+            if _twilio_client is None:
+                from requests.adapters import HTTPAdapter
+                from twilio.http.http_client import TwilioHttpClient
+                from twilio.rest import Client
+                
+                # One keep-alive session per worker, shared by all its threads
+                http_client = TwilioHttpClient(pool_connections=True, timeout=TWILIO_TIMEOUT)
+                http_client.session.mount('https://', HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=TWILIO_POOL_SIZE,
+                    max_retries=TWILIO_MAX_RETRIES
+                ))
+                _twilio_client = Client(account_sid, auth_token, http_client=http_client)
+    
+    return _twilio_client
+
+
+def get_stripe():
+    """Return the stripe module with the API key applied"""
+    global _stripe
+    
+    if _stripe is None:
+        with _lock:
+            if _stripe is None:
+                import stripe
+                stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+                _stripe = stripe
+    
+    return _stripe
+
+
+def async_twilio_available():
+    """Whether Twilio's asyncio client (built on aiohttp) can be used"""
+    return importlib.util.find_spec('aiohttp') is not None
+
+
+def create_async_twilio_client():
+    """Build a Twilio client for asyncio code
+    
+    Call it inside the running event loop: the aiohttp session belongs to that
+    loop. Returns (client, http_client); close http_client when done.
+    """
+    from twilio.http.async_http_client import AsyncTwilioHttpClient
+    from twilio.rest import Client
+    
+    http_client = AsyncTwilioHttpClient(pool_connections=True, timeout=TWILIO_TIMEOUT)
+    client = Client(os.getenv('TWILIO_ACCOUNT_SID'), os.getenv('TWILIO_AUTH_TOKEN'), http_client=http_client)
+    return client, http_client
@@ -0,0 +1,102 @@
+import math
+from flask import current_app
+from sqlalchemy.orm import contains_eager
+from src.models.agent import Agent
+from src.models.notification import Notification
+from src.models.user import User
+from src.services.shared_store import get_shared_store
+from src.services.twilio_service import TwilioService
+from src.database import db
+
+KM_PER_DEGREE = 111.32
+
+
+class DispatchService:
+    """Pick agents for a new order and alert them"""
+    
+    @staticmethod
+    def nearest_available_agents(lat, lng, limit, radius_km=None):
+        """Available, approved agents nearest to a point, closest first (one query)
+        
+        Distance is the flat-earth approximation, which ranks correctly at city
+        scale and keeps the ORDER BY plain arithmetic on every database.
+        Without a location, the most recently active agents are returned.
+        """
+        query = Agent.query.join(User, User.id == Agent.user_id).options(
+            contains_eager(Agent.user)
+        ).filter(
+            Agent.is_available.is_(True),
+            Agent.background_check_status == 'approved'
+        )
+        
+        if lat is None or lng is None:
+            return query.order_by(Agent.last_active.desc()).limit(limit).all()
+        
+        lng_scale = math.cos(math.radians(lat))
+        query = query.filter(
+            Agent.current_location_lat.isnot(None),
+            Agent.current_location_lng.isnot(None)
+        )
+        if radius_km:
+            # Bounding box first so the distance is only computed for nearby rows
+            lat_delta = radius_km / KM_PER_DEGREE
+            lng_delta = radius_km / (KM_PER_DEGREE * max(lng_scale, 0.01))
+            query = query.filter(
+                Agent.current_location_lat.between(lat - lat_delta, lat + lat_delta),
+                Agent.current_location_lng.between(lng - lng_delta, lng + lng_delta)
+            )
+        
+        lat_diff = Agent.current_location_lat - lat
+        lng_diff = (Agent.current_location_lng - lng) * lng_scale
+        return query.order_by(lat_diff * lat_diff + lng_diff * lng_diff).limit(limit).all()
+    
+    @staticmethod
+    def take_alert_slot(agent, per_minute):
+        """Per-agent throttle on job alerts, shared across workers"""
+        allowed, _ = get_shared_store().take_token(f"job-alerts:agent:{agent.id}", per_minute, per_minute / 60)
+        return allowed
+    
+    @staticmethod
+    def alert_agents_for_order(order):
+        """Text the nearest available agents about a newly pending order
+        
+        Candidates beyond the first DISPATCH_ALERT_AGENTS are only used when
+        nearer agents are throttled. Returns the notifications sent.
+        """
+        config = current_app.config
+        limit = config['DISPATCH_ALERT_AGENTS']
+        per_minute = config['DISPATCH_ALERTS_PER_MINUTE']
+        
+        # A replayed payment event only tops up alerts, never repeats them
+        alerted = {event_type for (event_type,) in db.session.query(Notification.event_type).filter(
+            Notification.order_id == order.id,
+            Notification.event_type.like('new_job:agent:%')
+        )}
+        limit -= len(alerted)
+        if limit <= 0:
+            return []
+        
+        candidates = DispatchService.nearest_available_agents(
+            order.location_lat, order.location_lng, limit * 3, config['DISPATCH_RADIUS_KM']
+        )
+        
+        agents = []
+        for agent in candidates:
+            if len(agents) >= limit:
+                break
+            if f"new_job:agent:{agent.id}" in alerted:
+                continue
+            try:
+                allowed = DispatchService.take_alert_slot(agent, per_minute)
+            except Exception as e:
+                # Fail open like the rate limiter - an alert beats no alert
+                print(f"Alert throttle unavailable: {str(e)}")
+                allowed = True
+            if allowed:
+                agents.append(agent)
+        
+        if not agents:
+            print(f"No agents available to alert for order {order.order_number}")
+            return []
+        
+        return TwilioService.send_new_job_alerts(agents, order)
@@ -0,0 +1,28 @@
+import io
+
+# Runs in the media worker processes, so it imports nothing from the app.
+# Pillow is optional: without it photos are served at their original size.
+
+
+def make_variants(data, sizes, quality=82):
+    """Resize image bytes to fit each {name: longest side} as JPEG
+    
+    Returns (width, height, {name: jpeg bytes}) with the original's size,
+    after applying its EXIF orientation.
+    """
+    from PIL import Image, ImageOps
+    
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        
+        variants = {}
+        for name, longest_side in sizes.items():
+            variant = image.copy()
+            variant.thumbnail((longest_side, longest_side))
+            output = io.BytesIO()
+            variant.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+            variants[name] = output.getvalue()
+        
+        return image.width, image.height, variants
@@ -0,0 +1,213 @@
+import hashlib
+import importlib.util
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from src.models.order_photo import OrderPhoto, VARIANT_SIZES
+from src.services.image_variants import make_variants
+from src.services.media_storage import get_media_storage
+from src.database import db
+
+PHOTO_KINDS = ('completion', 'receipt')
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the accepted formats -> (content type, extension)
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', ('image/jpeg', 'jpg')),
+    (b'\x89PNG\r\n\x1a\n', ('image/png', 'png')),
+]
+
+# Resizing runs in worker processes, created on first use in each web worker
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def images_available():
+    """Whether Pillow is installed to make the resized variants"""
+    return importlib.util.find_spec('PIL') is not None
+
+
+def get_image_pool():
+    """Return this process's image worker pool (spawned, not forked from a threaded server)"""
+    global _pool
+    
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=current_app.config['MEDIA_WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    
+    return _pool
+
+
+def shutdown_image_pool():
+    """Wait for queued resizes (and their callbacks) to finish, then stop the workers"""
+    global _pool
+    
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def sniff_image_type(head):
+    """(content type, extension) from a file's first bytes; ValueError if not a supported image"""
+    for signature, image_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return ('image/webp', 'webp')
+    raise ValueError("Unsupported image type - upload a JPEG, PNG or WebP photo")
+
+
+class MediaService:
+    """Store uploaded order photos and make their resized variants"""
+    
+    @staticmethod
+    def store_upload(stream, max_bytes):
+        """Hash an upload in chunks and store it under its content hash
+        
+        The upload is read twice - once to hash it, once to store it - and
+        never held in memory whole; Werkzeug has already spooled it to a
+        temporary file. A file that's already stored isn't written again.
+        Returns (content hash, content type, extension, size in bytes).
+        """
+        digest = hashlib.sha256()
+        head = b''
+        size = 0
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if len(head) < 16:
+                head += chunk[:16]
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Photo is larger than {max_bytes // (1024 * 1024)} MB")
+            digest.update(chunk)
+        
+        if not size:
+            raise ValueError("Photo is empty")
+        content_type, extension = sniff_image_type(head)
+        content_hash = digest.hexdigest()
+        
+        storage = get_media_storage()
+        key = OrderPhoto.original_key(content_hash, extension)
+        if not storage.exists(key):
+            stream.seek(0)
+            storage.save(key, stream)
+        
+        return content_hash, content_type, extension, size
+    
+    @staticmethod
+    def add_order_photo(order_id, kind, upload, uploaded_by=None):
+        """Attach an uploaded photo to an order; returns (photo, created)
+        
+        Uploading the same image again returns the existing photo. Variants
+        are made off the request path unless this image has been processed
+        before.
+        """
+        if kind not in PHOTO_KINDS:
+            raise ValueError(f"Photo kind must be one of: {', '.join(PHOTO_KINDS)}")
+        
+        content_hash, content_type, extension, size = MediaService.store_upload(
+            upload.stream, current_app.config['MAX_PHOTO_BYTES']
+        )
+        
+        existing = OrderPhoto.query.filter_by(order_id=order_id, kind=kind, content_hash=content_hash).first()
+        if existing:
+            return existing, False
+        
+        # Variants are per content hash, so reuse another photo's if it has them
+        processed = OrderPhoto.query.filter(
+            OrderPhoto.content_hash == content_hash,
+            OrderPhoto.status != 'processing'
+        ).first()
+        
+        photo = OrderPhoto(
+            order_id=order_id,
+            uploaded_by=uploaded_by,
+            kind=kind,
+            content_hash=content_hash,
+            content_type=content_type,
+            extension=extension,
+            size_bytes=size,
+            width=processed.width if processed else None,
+            height=processed.height if processed else None,
+            status=processed.status if processed else 'processing'
+        )
+        db.session.add(photo)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent upload of the same image won
+            db.session.rollback()
+            return OrderPhoto.query.filter_by(order_id=order_id, kind=kind, content_hash=content_hash).first(), False
+        
+        if photo.status == 'processing':
+            MediaService.schedule_variants(content_hash, extension)
+        
+        return photo, True
+    
+    @staticmethod
+    def schedule_variants(content_hash, extension):
+        """Make an image's variants in the worker pool; the result is stored from a callback"""
+        app = current_app._get_current_object()
+        
+        if not images_available():
+            print("Pillow is not installed - photos are served at original size")
+            MediaService.finish_variants(content_hash, {'status': 'original_only'})
+            return None
+        
+        with get_media_storage().open(OrderPhoto.original_key(content_hash, extension)) as f:
+            data = f.read()
+        
+        future = get_image_pool().submit(make_variants, data, VARIANT_SIZES)
+        future.add_done_callback(lambda done: MediaService.store_variants(app, content_hash, done))
+        return future
+    
+    @staticmethod
+    def store_variants(app, content_hash, future):
+        """Save a finished resize job's variants and mark the image's photos ready"""
+        with app.app_context():
+            try:
+                width, height, variants = future.result()
+                storage = get_media_storage()
+                for name, data in variants.items():
+                    storage.save(OrderPhoto.variant_key(content_hash, name), io.BytesIO(data))
+                values = {'status': 'ready', 'width': width, 'height': height}
+            except Exception as e:
+                print(f"Failed to make photo variants for {content_hash}: {str(e)}")
+                values = {'status': 'original_only'}
+            
+            MediaService.finish_variants(content_hash, values)
+    
+    @staticmethod
+    def finish_variants(content_hash, values):
+        """Record the outcome for every photo of an image still processing"""
+        try:
+            OrderPhoto.query.filter_by(content_hash=content_hash, status='processing').update(
+                values, synchronize_session=False
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Failed to update photo status for {content_hash}: {str(e)}")
+    
+    @staticmethod
+    def process_pending():
+        """Resubmit images left processing (e.g. by a restart) and wait for them; returns how many"""
+        pending = db.session.query(OrderPhoto.content_hash, OrderPhoto.extension).filter_by(
+            status='processing'
+        ).distinct().all()
+        
+        for content_hash, extension in pending:
+            MediaService.schedule_variants(content_hash, extension)
+        shutdown_image_pool()
+        
+        return len(pending)
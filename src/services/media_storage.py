@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import threading
+from flask import current_app
+
+
+class LocalStorage:
+    """Files under a local directory, served by the /media route"""
+    
+    def __init__(self, root, base_url):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip('/')
+    
+    def path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError("Invalid media key")
+        return path
+    
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+    
+    def save(self, key, stream):
+        """Write a file-like object to key; readers never see a partial file"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(stream, f, 64 * 1024)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    
+    def open(self, key):
+        return open(self.path(key), 'rb')
+    
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+
+# MEDIA_STORAGE names one of these; other backends (e.g. S3) need the same methods
+STORAGE_BACKENDS = {
+    'local': LocalStorage,
+}
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_media_storage():
+    """Return the process-wide media storage configured by MEDIA_STORAGE"""
+    global _storage
+    
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                config = current_app.config
+                backend = STORAGE_BACKENDS[config['MEDIA_STORAGE']]
+                _storage = backend(config['MEDIA_ROOT'], config['MEDIA_URL'])
+    
+    return _storage
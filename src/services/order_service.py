@@ -1,12 +1,81 @@
+import heapq
 import random
 import string
-from datetime import datetime
-from src.models.order import Order
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import selectinload
+from src.models.order import Order, AVAILABLE_ORDERS_WHERE
 from src.models.service import Service
 from src.models.agent import Agent
+from src.models.order_event import OrderEvent
+from src.models.archive import ArchivedOrder, ARCHIVED_STATUSES
 from src.services.twilio_service import TwilioService
+from src.services.dispatch_service import DispatchService
+from src.services.after_response import call_after_response
 from src.database import db
 
+# The incremental event feed lags this far behind the newest events
+EVENT_FEED_SETTLE_SECONDS = 5
+
+# Order state machine: the statuses each action may start from, the status
+# it moves to, the timestamp column it stamps and the event it logs. agent_values gives the
+# assigned agent's counter changes as SQL expressions of the order's
+# columns (agent_id, service_fee_cents); agent_conditions must hold for them.
+ORDER_TRANSITIONS = {
+    'pay': {
+        # Guest checkouts wait in awaiting_payment; app orders are created pending
+        'from': ('awaiting_payment', 'pending'),
+        'to': 'pending',
+        'timestamp': 'paid_at',
+        'event': 'paid',
+        'error': "Order is not awaiting payment",
+    },
+    'accept': {
+        'from': ('pending',),
+        'to': 'accepted',
+        'timestamp': 'accepted_at',
+        'event': 'accepted',
+        'error': "Order is no longer available",
+        'agent_conditions': (Agent.is_available.is_(True),),
+        'agent_values': lambda order: {
+            'total_jobs': func.coalesce(Agent.total_jobs, 0) + 1,
+            'is_available': False,  # Mark as busy
+        },
+    },
+    'start': {
+        'from': ('accepted',),
+        'to': 'in_progress',
+        'timestamp': 'started_at',
+        'event': 'started',
+        'error': "Order must be accepted before starting",
+    },
+    'complete': {
+        'from': ('in_progress',),
+        'to': 'completed',
+        'timestamp': 'completed_at',
+        'event': 'completed',
+        'error': "Order must be in progress to complete",
+        'agent_values': lambda order: {
+            'completed_jobs': func.coalesce(Agent.completed_jobs, 0) + 1,
+            'total_earnings_cents': func.coalesce(Agent.total_earnings_cents, 0) + order.service_fee_cents,
+            'is_available': True,  # Mark as available again
+        },
+    },
+    'cancel': {
+        'from': ('awaiting_payment', 'pending', 'accepted', 'in_progress'),
+        'to': 'cancelled',
+        'timestamp': 'cancelled_at',
+        'event': 'cancelled',
+        'error': "Cannot cancel completed or already cancelled order",
+        'agent_values': lambda order: {
+            'cancelled_jobs': func.coalesce(Agent.cancelled_jobs, 0) + 1,
+            'is_available': True,
+        },
+    },
+}
+
+
 class OrderService:
     """Service for managing orders"""
     
@@ -18,14 +87,16 @@ class OrderService:
             code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
             order_number = f"GO-{code}"
             
-            # Check if unique
-            existing = Order.query.filter_by(order_number=order_number).first()
+            # Check if unique, archived orders included
+            existing = Order.query.filter_by(order_number=order_number).first() or \
+                ArchivedOrder.query.filter_by(order_number=order_number).first()
             if not existing:
                 return order_number
     
     @staticmethod
     def create_order(customer, service_id, description, pickup_address=None, 
-                    delivery_address=None, special_instructions=None):
+                    delivery_address=None, special_instructions=None,
+                    location_lat=None, location_lng=None):
         """Create a new order"""
         # Get service
         service = Service.query.get(service_id)
@@ -44,40 +115,199 @@ class OrderService:
             pickup_address=pickup_address,
             delivery_address=delivery_address,
             special_instructions=special_instructions,
-            service_fee=service.base_price,
-            total_amount=service.base_price,  # Will be updated with additional costs
+            location_lat=location_lat,
+            location_lng=location_lng,
+            service_fee_cents=service.base_price_cents,
+            total_amount_cents=service.base_price_cents,  # Will be updated with additional costs
             status='pending'
         )
         
         db.session.add(order)
+        db.session.flush()
+        OrderService.record_event(order.id, 'created', created_at=order.created_at)
         db.session.commit()
         
         return order
     
     @staticmethod
-    def assign_agent(order_id, agent_id):
-        """Assign an agent to an order"""
-        order = Order.query.get(order_id)
+    def create_guest_order(service_slug, customer_name, customer_phone, description,
+                          line_items, service_fee_cents, additional_costs_cents=0, delivery_address=None,
+                          location_lat=None, location_lng=None):
+        """Create an unpaid guest checkout order (flushed, caller commits)
+        
+        service_slug comes from a price quote, which rejects unknown services;
+        this only catches one deactivated since the price table was loaded.
+        """
+        service = Service.query.filter_by(slug=service_slug, is_active=True).first()
+        if not service:
+            raise ValueError("Service not available")
+        
+        order = Order(
+            order_number=OrderService.generate_order_number(),
+            service_id=service.id,
+            guest_name=customer_name,
+            guest_phone=customer_phone,
+            description=description or service.name,
+            delivery_address=delivery_address,
+            location_lat=location_lat,
+            location_lng=location_lng,
+            line_items=line_items,
+            service_fee_cents=service_fee_cents,
+            additional_costs_cents=additional_costs_cents,
+            total_amount_cents=service_fee_cents + additional_costs_cents,
+            status='awaiting_payment'
+        )
+        
+        db.session.add(order)
+        db.session.flush()
+        OrderService.record_event(order.id, 'created', created_at=order.created_at)
+        
+        return order
+    
+    @staticmethod
+    def mark_paid(order_id, customer_email=None, event_data=None):
+        """Record payment of an order, from a Checkout Session or a PaymentIntent
+        
+        Returns True only for the call that actually recorded it, so follow-up
+        work (confirmation SMS, dispatch) runs once however often this is called.
+        """
+        values = {'guest_email': customer_email} if customer_email else {}
+        try:
+            OrderService.transition(order_id, 'pay', conditions=[Order.paid_at.is_(None)],
+                                    event_data=event_data, **values)
+        except ValueError:
+            return False
+        
+        db.session.commit()
+        return True
+    
+    @staticmethod
+    def confirm_checkout(session):
+        """Apply a Stripe Checkout Session to its order, confirming it to the customer once
+        
+        Called from both the checkout.session.completed webhook and the /success
+        fallback; whichever records the payment first sends the SMS, after its
+        response so a slow Twilio can't time out the webhook.
+        Returns the order, or None if the session isn't one of ours.
+        """
+        order = Order.query.filter_by(checkout_session_id=session.id).first()
         if not order:
-            raise ValueError("Order not found")
+            return None
         
-        agent = Agent.query.get(agent_id)
-        if not agent:
-            raise ValueError("Agent not found")
+        if session.payment_status == 'paid' and not order.paid_at:
+            customer_email = session.customer_details.email if session.customer_details else None
+            
+            if OrderService.mark_paid(order.id, customer_email):
+                call_after_response(OrderService.announce_payment, order.id)
         
-        if not agent.is_available:
-            raise ValueError("Agent is not available")
+        return order
+    
+    @staticmethod
+    def announce_payment(order_id, confirm_to_customer=True):
+        """Confirm a newly paid order to its customer and alert nearby agents"""
+        order = Order.query.get(order_id)
+        
+        if confirm_to_customer:
+            try:
+                TwilioService.send_order_confirmation(order)
+            except Exception as e:
+                # Payment is recorded either way; still alert the agents
+                print(f"Failed to send confirmation for {order.order_number}: {str(e)}")
+        
+        OrderService.dispatch(order)
+    
+    @staticmethod
+    def dispatch(order):
+        """Alert nearby agents that an order is ready for assignment"""
+        try:
+            DispatchService.alert_agents_for_order(order)
+        except Exception as e:
+            print(f"Failed to alert agents for {order.order_number}: {str(e)}")
+    
+    @staticmethod
+    def transition(order_id, action, conditions=(), event_data=None, **values):
+        """Apply a transition from ORDER_TRANSITIONS, with its agent counter changes
+        
+        The status check, the new status, its timestamp and any extra column
+        values are a single conditional UPDATE, so racing transitions can't
+        both win. Agent counters are incremented in SQL, never read into
+        Python: on PostgreSQL in the same statement (data-modifying CTEs),
+        elsewhere in a second UPDATE within the same transaction. The event
+        is logged in that transaction too, with event_data as its details.
         
-        # Assign agent
-        order.agent_id = agent_id
-        order.status = 'accepted'
-        order.accepted_at = datetime.utcnow()
+        Returns the number of agent rows updated. Raises ValueError (after a
+        lookup, on the failure path only) if the order is missing or not in a
+        state the transition starts from.
+        """
+        rule = ORDER_TRANSITIONS[action]
+        now = datetime.utcnow()
+        values.update({'status': rule['to'], rule['timestamp']: now})
+        where = [Order.id == order_id, Order.status.in_(rule['from']), *conditions]
+        agent_values = rule.get('agent_values')
         
-        # Update agent stats
-        agent.total_jobs += 1
-        agent.is_available = False  # Mark as busy
+        if agent_values and db.engine.dialect.name == 'postgresql':
+            moved = update(Order).where(*where).values(values).returning(
+                Order.id, Order.agent_id, Order.service_fee_cents
+            ).cte('moved')
+            counted = update(Agent).where(
+                Agent.id == moved.c.agent_id, *rule.get('agent_conditions', ())
+            ).values(agent_values(moved.c)).returning(Agent.id).cte('counted')
+            
+            updated, agents_updated = db.session.execute(
+                select(
+                    select(func.count()).select_from(moved).scalar_subquery(),
+                    select(func.count()).select_from(counted).scalar_subquery()
+                ).execution_options(db_write=True)
+            ).one()
+        else:
+            updated = Order.query.filter(*where).update(values, synchronize_session=False)
+            agents_updated = 0
+            if updated == 1 and agent_values:
+                # Read the order's columns inside the UPDATE, not into Python
+                order_columns = SimpleNamespace(**{
+                    name: select(getattr(Order, name)).where(Order.id == order_id).scalar_subquery()
+                    for name in ('agent_id', 'service_fee_cents')
+                })
+                agents_updated = Agent.query.filter(
+                    Agent.id == order_columns.agent_id, *rule.get('agent_conditions', ())
+                ).update(agent_values(order_columns), synchronize_session=False)
+        
+        if updated != 1:
+            if not db.session.query(Order.id).filter_by(id=order_id).first():
+                raise ValueError("Order not found")
+            raise ValueError(rule['error'])
+        
+        # Stamped once the UPDATE holds the row lock, so only the commit is left
+        OrderService.record_event(order_id, rule['event'], event_data)
+        return agents_updated
+    
+    @staticmethod
+    def record_event(order_id, event_type, data=None, created_at=None):
+        """Append to an order's event log, in the caller's transaction (commit it promptly)"""
+        event = OrderEvent(
+            order_id=order_id,
+            event_type=event_type,
+            data=data or None,
+            created_at=created_at or datetime.utcnow()
+        )
+        db.session.add(event)
+        return event
+    
+    @staticmethod
+    def assign_agent(order_id, agent_id):
+        """Assign an agent to an order"""
+        if not db.session.query(Agent.id).filter_by(id=agent_id).first():
+            raise ValueError("Agent not found")
+        
+        # Only an unassigned order can be taken - two agents can't both accept it -
+        # and the agent must still be free when their counters are updated
+        if not OrderService.transition(order_id, 'accept', conditions=[Order.agent_id.is_(None)],
+                                       event_data={'agent_id': agent_id}, agent_id=agent_id):
+            db.session.rollback()
+            raise ValueError("Agent is not available")
         
         db.session.commit()
+        order = Order.query.get(order_id)
         
         # Send notifications
         try:
@@ -90,17 +320,10 @@ class OrderService:
     @staticmethod
     def start_order(order_id):
         """Mark order as started"""
-        order = Order.query.get(order_id)
-        if not order:
-            raise ValueError("Order not found")
-        
-        if order.status != 'accepted':
-            raise ValueError("Order must be accepted before starting")
-        
-        order.status = 'in_progress'
-        order.started_at = datetime.utcnow()
+        OrderService.transition(order_id, 'start')
         
         db.session.commit()
+        order = Order.query.get(order_id)
         
         # Send notification
         try:
@@ -112,31 +335,21 @@ class OrderService:
     
     @staticmethod
     def complete_order(order_id, completion_notes=None, completion_photos=None, 
-                      receipt_photos=None, additional_costs=0):
-        """Complete an order"""
-        order = Order.query.get(order_id)
-        if not order:
-            raise ValueError("Order not found")
-        
-        if order.status != 'in_progress':
-            raise ValueError("Order must be in progress to complete")
-        
-        # Update order
-        order.status = 'completed'
-        order.completed_at = datetime.utcnow()
-        order.completion_notes = completion_notes
-        order.completion_photos = completion_photos or []
-        order.receipt_photos = receipt_photos or []
-        order.additional_costs = additional_costs
-        order.total_amount = float(order.service_fee) + float(additional_costs)
-        
-        # Update agent stats
-        if order.agent:
-            order.agent.completed_jobs += 1
-            order.agent.total_earnings = float(order.agent.total_earnings or 0) + float(order.service_fee)
-            order.agent.is_available = True  # Mark as available again
+                      receipt_photos=None, additional_costs_cents=0):
+        """Complete an order, adding the agent's costs to any already charged (e.g. prepaid items)"""
+        already_charged = func.coalesce(Order.additional_costs_cents, 0)
+        OrderService.transition(
+            order_id, 'complete',
+            event_data={'additional_costs_cents': additional_costs_cents},
+            completion_notes=completion_notes,
+            completion_photos=completion_photos or [],
+            receipt_photos=receipt_photos or [],
+            additional_costs_cents=already_charged + additional_costs_cents,
+            total_amount_cents=Order.service_fee_cents + already_charged + additional_costs_cents
+        )
         
         db.session.commit()
+        order = Order.query.get(order_id)
         
         # Send notification
         try:
@@ -149,49 +362,70 @@ class OrderService:
     @staticmethod
     def cancel_order(order_id, reason=None):
         """Cancel an order"""
-        order = Order.query.get(order_id)
-        if not order:
-            raise ValueError("Order not found")
-        
-        if order.status in ['completed', 'cancelled']:
-            raise ValueError("Cannot cancel completed or already cancelled order")
-        
-        order.status = 'cancelled'
-        order.cancelled_at = datetime.utcnow()
-        
-        # If agent was assigned, update their stats and availability
-        if order.agent:
-            order.agent.cancelled_jobs += 1
-            order.agent.is_available = True
+        OrderService.transition(order_id, 'cancel', event_data={'reason': reason} if reason else None)
         
         db.session.commit()
         
-        return order
+        return Order.query.get(order_id)
     
     @staticmethod
     def get_available_orders():
         """Get orders available for agents to accept"""
-        return Order.query.filter_by(
-            status='pending',
-            agent_id=None
+        return Order.query.options(selectinload(Order.photos)).filter(
+            db.text(AVAILABLE_ORDERS_WHERE)
         ).order_by(Order.created_at.desc()).all()
     
+    @staticmethod
+    def get_order(order_id):
+        """Get an order by ID, falling back to the archive"""
+        return Order.query.get(order_id) or ArchivedOrder.query.get(order_id)
+    
     @staticmethod
     def get_customer_orders(customer_id, status=None):
-        """Get orders for a customer"""
-        query = Order.query.filter_by(customer_id=customer_id)
-        
-        if status:
-            query = query.filter_by(status=status)
-        
-        return query.order_by(Order.created_at.desc()).all()
+        """Get orders for a customer, archived ones included"""
+        return OrderService.order_history(customer_id=customer_id, status=status)
     
     @staticmethod
     def get_agent_orders(agent_id, status=None):
-        """Get orders for an agent"""
-        query = Order.query.filter_by(agent_id=agent_id)
+        """Get orders for an agent, archived ones included"""
+        return OrderService.order_history(agent_id=agent_id, status=status)
+    
+    @staticmethod
+    def order_history(status=None, **filters):
+        """Newest-first orders matching filters from the hot and archive tables
+        
+        The archive is only read when the status filter allows finished orders.
+        Both reads are served by the tables' customer/agent indexes.
+        """
+        results = []
+        for model in (Order, ArchivedOrder):
+            if model is ArchivedOrder and status and status not in ARCHIVED_STATUSES:
+                continue
+            
+            query = model.query.filter_by(**filters).options(selectinload(model.photos))
+            if status:
+                query = query.filter_by(status=status)
+            results.append(query.order_by(model.created_at.desc()).all())
         
-        if status:
-            query = query.filter_by(status=status)
+        return list(heapq.merge(*results, key=lambda order: order.created_at or datetime.min, reverse=True))
+    
+    @staticmethod
+    def get_order_timeline(order_id):
+        """An order's events, oldest first (one index range read)"""
+        return OrderEvent.query.filter_by(order_id=order_id).order_by(OrderEvent.seq).all()
+    
+    @staticmethod
+    def get_events_after(after_seq=0, limit=500):
+        """Events for all orders with seq > after_seq, for incremental consumers
         
-        return query.order_by(Order.created_at.desc()).all()
+        Events younger than EVENT_FEED_SETTLE_SECONDS are held back: seq is
+        assigned at insert but rows become visible at commit, so a fresh
+        transaction could still commit a lower seq than one already read.
+        That only holds while every writer commits right after recording an
+        event - never make an external call (Stripe, Twilio) in between.
+        """
+        settled = datetime.utcnow() - timedelta(seconds=EVENT_FEED_SETTLE_SECONDS)
+        return OrderEvent.query.filter(
+            OrderEvent.seq > after_seq,
+            OrderEvent.created_at <= settled
+        ).order_by(OrderEvent.seq).limit(limit).all()
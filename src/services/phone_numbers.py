@@ -0,0 +1,33 @@
+import os
+import re
+
+# Numbers entered without a country code are assumed to be in this one (NANP)
+DEFAULT_COUNTRY_CODE = os.getenv('DEFAULT_PHONE_COUNTRY_CODE', '1')
+
+_FORMATTING = re.compile(r'[\s().\-/]')
+_NANP = re.compile(r'^[2-9]\d{2}[2-9]\d{6}$')
+
+
+def to_e164(phone, default_country_code=DEFAULT_COUNTRY_CODE):
+    """Validate a phone number and return it in E.164 form (+15555551234)
+    
+    Raises ValueError for anything Twilio would reject, so bad numbers are
+    caught when they're entered rather than on the first send.
+    """
+    digits = _FORMATTING.sub('', str(phone or ''))
+    
+    if digits.startswith('+'):
+        digits = digits[1:]
+    elif digits.startswith('00'):
+        digits = digits[2:]  # international dialling prefix
+    elif default_country_code == '1' and len(digits) == 11 and digits.startswith('1'):
+        pass  # national number typed with the leading 1
+    else:
+        digits = default_country_code + digits
+    
+    if not digits.isdigit() or not 8 <= len(digits) <= 15 or digits.startswith('0'):
+        raise ValueError("Invalid phone number")
+    if digits.startswith('1') and not _NANP.match(digits[1:]):
+        raise ValueError("Invalid phone number")
+    
+    return '+' + digits
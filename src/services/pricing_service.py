@@ -0,0 +1,157 @@
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from src.models.service import Service
+from src.models.menu_item import MenuItem
+
+# Prices are read from the database into a process-wide table and refreshed
+# every PRICE_TABLE_TTL seconds, so quoting never touches the database.
+_price_table = None
+_price_table_lock = threading.Lock()
+
+MAX_ITEM_QUANTITY = 50
+
+
+class PriceTable:
+    """Immutable snapshot of active service and menu prices, in cents"""
+    
+    def __init__(self, services, menus):
+        self.services = services  # slug -> {'id', 'name', 'base_amount'}
+        self.menus = menus  # service slug -> {sku -> {'sku', 'name', 'unit_amount'}}
+        self.menu_names = {
+            slug: {item['name'].lower(): item for item in items.values()}
+            for slug, items in menus.items()
+        }
+        # Same prices give the same version in every worker
+        payload = json.dumps([services, menus], sort_keys=True).encode('utf-8')
+        self.version = hashlib.sha1(payload).hexdigest()[:12]
+        self.loaded_at = time.monotonic()
+    
+    def find_item(self, service_slug, item):
+        """Look up a cart item by sku, falling back to its display name"""
+        sku = item.get('sku') or item.get('id')
+        if sku is not None and str(sku) in self.menus.get(service_slug, {}):
+            return self.menus[service_slug][str(sku)]
+        name = (item.get('name') or '').strip().lower()
+        return self.menu_names.get(service_slug, {}).get(name)
+
+
+class PricingService:
+    """Server-side pricing from the database's service and menu prices"""
+    
+    @staticmethod
+    def load_price_table():
+        """Build a fresh price table (two queries)"""
+        services = {}
+        for service in Service.query.filter_by(is_active=True).all():
+            services[service.slug] = {
+                'id': service.id,
+                'name': service.name,
+                'base_amount': service.base_price_cents,
+            }
+        
+        slugs_by_id = {info['id']: slug for slug, info in services.items()}
+        menus = {}
+        items = MenuItem.query.filter_by(is_active=True).order_by(MenuItem.sort_order).all()
+        for item in items:
+            slug = slugs_by_id.get(item.service_id)
+            if slug:
+                menus.setdefault(slug, {})[item.sku] = {
+                    'sku': item.sku,
+                    'name': item.name,
+                    'unit_amount': item.price_cents,
+                }
+        
+        return PriceTable(services, menus)
+    
+    @staticmethod
+    def get_price_table():
+        """Return the current price table, reloading it once it is older than the TTL"""
+        global _price_table
+        
+        ttl = current_app.config.get('PRICE_TABLE_TTL', 60)
+        table = _price_table
+        if table is None or time.monotonic() - table.loaded_at > ttl:
+            with _price_table_lock:
+                table = _price_table
+                if table is None or time.monotonic() - table.loaded_at > ttl:
+                    table = _price_table = PricingService.load_price_table()
+        
+        return table
+    
+    @staticmethod
+    def invalidate():
+        """Drop the cached table so the next quote reloads prices"""
+        global _price_table
+        _price_table = None
+    
+    @staticmethod
+    def quote(cart, table=None):
+        """Price one cart: {'service': slug, 'items': [{'sku' or 'name', 'quantity'}]}
+        
+        Any client-supplied prices are ignored. Raises ValueError for unknown
+        services or items and for invalid quantities.
+        """
+        if table is None:
+            table = PricingService.get_price_table()
+        
+        service_slug = cart.get('service')
+        service = table.services.get(service_slug)
+        if not service:
+            raise ValueError(f"Unknown service: {service_slug}")
+        
+        line_items = []
+        # Only services with a menu buy items on the customer's behalf
+        if service_slug in table.menus:
+            for item in cart.get('items') or []:
+                menu_item = table.find_item(service_slug, item)
+                if not menu_item:
+                    raise ValueError(f"Unknown item: {item.get('sku') or item.get('name')}")
+                
+                try:
+                    quantity = int(item.get('quantity', 1))
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid quantity for {menu_item['name']}")
+                if not 1 <= quantity <= MAX_ITEM_QUANTITY:
+                    raise ValueError(f"Invalid quantity for {menu_item['name']}")
+                
+                line_items.append({
+                    'sku': menu_item['sku'],
+                    'name': menu_item['name'],
+                    'quantity': quantity,
+                    'unit_amount': menu_item['unit_amount'],
+                })
+        
+        items_amount = sum(item['unit_amount'] * item['quantity'] for item in line_items)
+        
+        return {
+            'service': service_slug,
+            'service_name': service['name'],
+            'line_items': line_items,
+            'service_fee_cents': service['base_amount'],
+            'items_total_cents': items_amount,
+            'total_cents': service['base_amount'] + items_amount,
+            'currency': 'usd',
+            'price_version': table.version,
+        }
+    
+    @staticmethod
+    def quote_many(carts):
+        """Price many carts against one snapshot; bad carts get an error, not an exception"""
+        table = PricingService.get_price_table()
+        quotes = []
+        
+        for cart in carts:
+            try:
+                quotes.append({'quote': PricingService.quote(cart, table)})
+            except ValueError as e:
+                quotes.append({'error': str(e)})
+        
+        return quotes
+    
+    @staticmethod
+    def get_menu(service_slug):
+        """Active menu items for a service, in cents"""
+        return list(PricingService.get_price_table().menus.get(service_slug, {}).values())
@@ -0,0 +1,93 @@
+import time
+from datetime import datetime, timedelta
+from src.models.notification import Notification
+from src.models.archive import ArchivedNotification
+from src.database import db
+
+# Both tables follow the same policy; archived rows are just older
+NOTIFICATION_MODELS = (Notification, ArchivedNotification)
+
+
+class RetentionService:
+    """Drop old notification bodies and rows, a small batch per transaction"""
+    
+    @staticmethod
+    def purge_bodies_batch(model, cutoff, batch_size):
+        """Empty subject/message of one batch older than cutoff; returns rows purged"""
+        # (body_purged_at, created_at) index: only unpurged rows are visited
+        ids = [row_id for (row_id,) in db.session.query(model.id).filter(
+            model.body_purged_at.is_(None),
+            model.created_at < cutoff
+        ).order_by(model.created_at).limit(batch_size)]
+        if not ids:
+            return 0
+        
+        model.query.filter(model.id.in_(ids)).update({
+            'subject': None,
+            'message': None,
+            'body_purged_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        return len(ids)
+    
+    @staticmethod
+    def delete_batch(model, cutoff, batch_size):
+        """Delete one batch of rows older than cutoff; returns rows deleted"""
+        ids = [row_id for (row_id,) in db.session.query(model.id).filter(
+            model.created_at < cutoff
+        ).order_by(model.created_at).limit(batch_size)]
+        if not ids:
+            return 0
+        
+        model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        return len(ids)
+    
+    @staticmethod
+    def run_batches(step, batch_size, max_batches=None, pause=0):
+        """Call step(batch_size) until a batch comes back short; returns the total"""
+        total = 0
+        batches = 0
+        
+        while max_batches is None or batches < max_batches:
+            try:
+                count = step(batch_size)
+            except Exception:
+                db.session.rollback()
+                raise
+            total += count
+            batches += 1
+            
+            if count < batch_size:
+                break
+            if pause:
+                time.sleep(pause)  # let replicas catch up between batches
+        
+        return total
+    
+    @staticmethod
+    def apply_notification_retention(body_days, delete_days, batch_size=1000, max_batches=None, pause=0):
+        """Delete notifications older than delete_days, then purge bodies older than body_days
+        
+        Status, recipient, event type, SIDs and timestamps stay until the row
+        is deleted. Deleting a row also forgets its (order_id, event_type)
+        claim, so delete_days must be longer than any replay of an order event.
+        Returns {'deleted': n, 'purged': n}.
+        """
+        now = datetime.utcnow()
+        delete_cutoff = now - timedelta(days=delete_days)
+        body_cutoff = now - timedelta(days=body_days)
+        result = {'deleted': 0, 'purged': 0}
+        
+        for model in NOTIFICATION_MODELS:
+            # Delete first so bodies aren't purged on rows about to go anyway
+            result['deleted'] += RetentionService.run_batches(
+                lambda size: RetentionService.delete_batch(model, delete_cutoff, size),
+                batch_size, max_batches, pause
+            )
+            result['purged'] += RetentionService.run_batches(
+                lambda size: RetentionService.purge_bodies_batch(model, body_cutoff, size),
+                batch_size, max_batches, pause
+            )
+        
+        return result
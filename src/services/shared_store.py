@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # only needed with REDIS_URL - state stays per process without it
+    redis = None
+
+
+# Token bucket refill and take, atomic on the Redis server. Returns
+# {allowed (0/1), seconds until a token is available}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class MemoryStore:
+    """Process-local key/value store with per-key expiry
+    
+    Each worker process keeps its own copy, so rate limits enforced through it
+    apply per process: the effective limit is the configured one times the
+    number of workers.
+    """
+    
+    def __init__(self):
+        self._data = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            with self._lock:
+                self._data.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            # Opportunistic sweep so abandoned keys don't accumulate forever
+            if len(self._data) > 10000:
+                now = time.monotonic()
+                for stale in [k for k, (_, exp) in self._data.items() if exp <= now]:
+                    del self._data[stale]
+    
+    def set_if_absent(self, key, value, ttl):
+        """Set a key only if it is missing or expired; True if this call set it"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > now:
+                return False
+            self._data[key] = (value, now + ttl)
+            return True
+    
+    def take_token(self, key, capacity, rate):
+        """Take one token from a bucket refilled at `rate` per second
+        
+        Returns (allowed, seconds until the next token is available).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / rate
+            
+            # Full buckets carry no state worth keeping
+            if len(self._buckets) > 10000:
+                for stale in [k for k, (_, ts) in self._buckets.items() if now - ts > 3600]:
+                    del self._buckets[stale]
+        
+        return allowed, retry_after
+
+
+class RedisStore:
+    """Key/value store shared by every worker through Redis"""
+    
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._token_bucket = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+    
+    def get(self, key):
+        value = self.client.get(key)
+        return value.decode('utf-8') if value is not None else None
+    
+    def set(self, key, value, ttl):
+        self.client.set(key, value, px=int(ttl * 1000))
+    
+    def set_if_absent(self, key, value, ttl):
+        """Set a key only if it is missing; True if this call set it"""
+        return bool(self.client.set(key, value, px=int(ttl * 1000), nx=True))
+    
+    def take_token(self, key, capacity, rate):
+        """Take one token from a bucket shared by every worker"""
+        allowed, retry_after = self._token_bucket(keys=[key], args=[capacity, rate, time.time()])
+        return bool(allowed), float(retry_after)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """Return the process-wide store: Redis when REDIS_URL is set, else in-memory (per process)"""
+    global _store
+    
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                url = os.getenv('REDIS_URL')
+                if url and redis is None:
+                    raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+                _store = RedisStore(url) if url else MemoryStore()
+    
+    return _store
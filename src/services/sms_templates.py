@@ -0,0 +1,105 @@
+from string import Template
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from src.models.agent import Agent
+from src.models.money import format_dollars
+from src.models.order import Order
+from src.models.service import Service
+from src.models.user import User
+from src.database import db
+
+# SMS bodies by event type, compiled once at import. Placeholders are filled
+# from the flat context built by order_sms_context().
+TEMPLATES = {
+    'order_confirmed': Template("""Go4me.ai Order Confirmed! 🎉
+
+Order #$order_number
+Service: $service_name
+Total: $$$total
+
+We'll notify you when an agent accepts your order.
+
+Track: https://go4me.ai/order/$order_number"""),
+    'agent_assigned': Template("""Your Go4me.ai order has been accepted! 🚀
+
+Order #$order_number
+Agent: $agent_name
+Phone: $agent_phone
+
+$agent_name will contact you shortly.
+
+Track: https://go4me.ai/order/$order_number"""),
+    'order_started': Template("""Your gopher is on the way! 🏃
+
+Order #$order_number
+Agent: $agent_name
+
+You'll receive updates as your task progresses.
+
+Track: https://go4me.ai/order/$order_number"""),
+    'order_completed': Template("""Your order is complete! ✅
+
+Order #$order_number
+Total: $$$total
+
+Photos and receipts are available in your dashboard.
+
+View: https://go4me.ai/order/$order_number
+
+Thank you for using Go4me.ai!"""),
+    'new_job': Template("""New Go4me.ai Job Available! 💼
+
+Service: $service_name
+Pay: $$$service_fee
+Location: $location
+
+Accept now: https://go4me.ai/agent/job/$order_id"""),
+}
+
+
+def render(event_type, context):
+    """Render the template for an event; raises KeyError for unknown events or fields"""
+    return TEMPLATES[event_type].substitute(context)
+
+
+def order_sms_context(order_id):
+    """Everything the order templates need, fetched in one query"""
+    customer = aliased(User)
+    agent_user = aliased(User)
+    
+    row = db.session.query(
+        Order.id,
+        Order.order_number,
+        Order.customer_id,
+        Order.total_amount_cents,
+        Order.service_fee_cents,
+        Order.pickup_address,
+        Service.name.label('service_name'),
+        func.coalesce(customer.phone, Order.guest_phone).label('customer_phone'),
+        agent_user.first_name.label('agent_name'),
+        agent_user.phone.label('agent_phone'),
+    ).join(
+        Service, Service.id == Order.service_id
+    ).outerjoin(
+        customer, customer.id == Order.customer_id
+    ).outerjoin(
+        Agent, Agent.id == Order.agent_id
+    ).outerjoin(
+        agent_user, agent_user.id == Agent.user_id
+    ).filter(Order.id == order_id).first()
+    
+    if row is None:
+        raise ValueError("Order not found")
+    
+    return {
+        'order_id': row.id,
+        'order_number': row.order_number,
+        'customer_id': row.customer_id,
+        'customer_phone': row.customer_phone,
+        'service_name': row.service_name,
+        'total': format_dollars(row.total_amount_cents),
+        'service_fee': format_dollars(row.service_fee_cents),
+        'location': row.pickup_address or 'See app',
+        'agent_name': row.agent_name or '',
+        'agent_phone': row.agent_phone or '',
+    }
@@ -1,28 +1,32 @@
 import os
-import stripe
 from datetime import datetime
 from src.models.payment import Payment
+from src.models.money import to_dollars
+from src.metrics import external_call
+from src.services.clients import get_stripe
+from src.services.order_service import OrderService
+from src.services.after_response import call_after_response
 from src.database import db
 
-# Initialize Stripe
-stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
-
 class StripeService:
     """Service for handling Stripe payments"""
     
     @staticmethod
     def create_customer(user):
         """Create a Stripe customer for a user"""
+        stripe = get_stripe()
+        
         try:
-            customer = stripe.Customer.create(
-                email=user.email,
-                name=user.full_name,
-                phone=user.phone,
-                metadata={
-                    'user_id': user.id,
-                    'role': user.role
-                }
-            )
+            with external_call('stripe', 'customer.create'):
+                customer = stripe.Customer.create(
+                    email=user.email,
+                    name=user.full_name,
+                    phone=user.phone,
+                    metadata={
+                        'user_id': user.id,
+                        'role': user.role
+                    }
+                )
             
             # Save Stripe customer ID to user
             user.stripe_customer_id = customer.id
@@ -36,34 +40,34 @@ class StripeService:
     @staticmethod
     def create_payment_intent(order, user):
         """Create a payment intent for an order"""
+        stripe = get_stripe()
+        
         try:
             # Ensure user has a Stripe customer ID
             if not user.stripe_customer_id:
                 StripeService.create_customer(user)
             
-            # Calculate amount in cents
-            amount_cents = int(float(order.total_amount) * 100)
-            
             # Create payment intent
-            intent = stripe.PaymentIntent.create(
-                amount=amount_cents,
-                currency='usd',
-                customer=user.stripe_customer_id,
-                metadata={
-                    'order_id': order.id,
-                    'order_number': order.order_number,
-                    'user_id': user.id
-                },
-                description=f"Go4me.ai Order #{order.order_number}",
-                automatic_payment_methods={'enabled': True},
-            )
+            with external_call('stripe', 'payment_intent.create'):
+                intent = stripe.PaymentIntent.create(
+                    amount=order.total_amount_cents,
+                    currency='usd',
+                    customer=user.stripe_customer_id,
+                    metadata={
+                        'order_id': order.id,
+                        'order_number': order.order_number,
+                        'user_id': user.id
+                    },
+                    description=f"Go4me.ai Order #{order.order_number}",
+                    automatic_payment_methods={'enabled': True},
+                )
             
             # Create payment record
             payment = Payment(
                 user_id=user.id,
                 order_id=order.id,
                 stripe_payment_intent_id=intent.id,
-                amount=order.total_amount,
+                amount_cents=order.total_amount_cents,
                 currency='usd',
                 status='pending'
             )
@@ -73,7 +77,7 @@ class StripeService:
             return {
                 'client_secret': intent.client_secret,
                 'payment_intent_id': intent.id,
-                'amount': float(order.total_amount)
+                'amount': to_dollars(order.total_amount_cents)
             }
             
         except stripe.error.StripeError as e:
@@ -83,8 +87,11 @@ class StripeService:
     @staticmethod
     def confirm_payment(payment_intent_id):
         """Confirm a payment was successful"""
+        stripe = get_stripe()
+        
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            with external_call('stripe', 'payment_intent.retrieve'):
+                intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
             # Find payment record
             payment = Payment.query.filter_by(
@@ -95,6 +102,7 @@ class StripeService:
                 raise ValueError("Payment record not found")
             
             # Update payment status
+            newly_paid = False
             if intent.status == 'succeeded':
                 payment.status = 'succeeded'
                 payment.succeeded_at = datetime.utcnow()
@@ -107,8 +115,8 @@ class StripeService:
                     if charge.payment_method_details.card:
                         payment.last4 = charge.payment_method_details.card.last4
                 
-                # Update order status
-                payment.order.status = 'pending'  # Ready for agent assignment
+                # Ready for agent assignment: the same guarded transition as checkouts
+                newly_paid = OrderService.mark_paid(payment.order_id, event_data={'payment_id': payment.id})
                 
             elif intent.status == 'requires_payment_method':
                 payment.status = 'failed'
@@ -116,6 +124,10 @@ class StripeService:
             
             db.session.commit()
             
+            if newly_paid:
+                # After the webhook is answered - agent alerts fan out over Twilio
+                call_after_response(OrderService.announce_payment, payment.order_id, False)
+            
             return payment.to_dict()
             
         except stripe.error.StripeError as e:
@@ -123,8 +135,10 @@ class StripeService:
             raise
     
     @staticmethod
-    def create_refund(payment_id, amount=None, reason=None):
+    def create_refund(payment_id, amount_cents=None, reason=None):
         """Create a refund for a payment"""
+        stripe = get_stripe()
+        
         try:
             payment = Payment.query.get(payment_id)
             if not payment:
@@ -133,23 +147,24 @@ class StripeService:
             if not payment.stripe_charge_id:
                 raise ValueError("No charge ID found for this payment")
             
-            # Calculate refund amount (full refund if not specified)
-            refund_amount_cents = int(float(amount or payment.amount) * 100)
+            # Full refund if no amount is given
+            refund_amount_cents = amount_cents or payment.amount_cents
             
             # Create refund in Stripe
-            refund = stripe.Refund.create(
-                charge=payment.stripe_charge_id,
-                amount=refund_amount_cents,
-                reason=reason or 'requested_by_customer',
-                metadata={
-                    'payment_id': payment.id,
-                    'order_id': payment.order_id
-                }
-            )
+            with external_call('stripe', 'refund.create'):
+                refund = stripe.Refund.create(
+                    charge=payment.stripe_charge_id,
+                    amount=refund_amount_cents,
+                    reason=reason or 'requested_by_customer',
+                    metadata={
+                        'payment_id': payment.id,
+                        'order_id': payment.order_id
+                    }
+                )
             
             # Update payment record
             payment.status = 'refunded'
-            payment.refund_amount = amount or payment.amount
+            payment.refund_amount_cents = refund_amount_cents
             payment.refund_reason = reason
             payment.refunded_at = datetime.utcnow()
             
@@ -164,6 +179,8 @@ class StripeService:
     @staticmethod
     def webhook_handler(payload, sig_header):
         """Handle Stripe webhooks"""
+        stripe = get_stripe()
+        
         webhook_secret = os.getenv('STRIPE_WEBHOOK_SECRET')
         
         try:
@@ -186,6 +203,10 @@ class StripeService:
                     payment.failed_at = datetime.utcnow()
                     db.session.commit()
             
+            elif event.type in ('checkout.session.completed', 'checkout.session.async_payment_succeeded'):
+                # Guest checkout: record payment locally so /success needn't ask Stripe
+                OrderService.confirm_checkout(event.data.object)
+            
             return {'status': 'success'}
             
         except ValueError as e:
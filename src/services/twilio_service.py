@@ -1,45 +1,116 @@
+import asyncio
 import os
 from datetime import datetime
-from twilio.rest import Client
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from src.models.notification import Notification
+from src.metrics import external_call
+from src.services.clients import async_twilio_available, create_async_twilio_client, get_twilio_client
+from src.services.sms_templates import order_sms_context, render
 from src.database import db
 
-# Initialize Twilio
-account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-auth_token = os.getenv('TWILIO_AUTH_TOKEN')
 twilio_phone = os.getenv('TWILIO_PHONE_NUMBER')
+max_in_flight = int(os.getenv('TWILIO_MAX_IN_FLIGHT', 20))  # concurrent sends per bulk batch
+
+
+async def _send_batch(messages):
+    """Send (to, body) pairs over one pooled session; returns a SID or exception per message"""
+    client, http_client = create_async_twilio_client()
+    semaphore = asyncio.Semaphore(max_in_flight)
+    
+    async def send(to_phone, body):
+        async with semaphore:
+            with external_call('twilio', 'messages.create'):
+                message = await client.messages.create_async(body=body, from_=twilio_phone, to=to_phone)
+            return message.sid
+    
+    try:
+        return await asyncio.gather(*(send(to, body) for to, body in messages), return_exceptions=True)
+    finally:
+        await http_client.close()
+
+
+def _send_blocking(messages):
+    client = get_twilio_client()
+    results = []
+    for to_phone, body in messages:
+        try:
+            with external_call('twilio', 'messages.create'):
+                results.append(client.messages.create(body=body, from_=twilio_phone, to=to_phone).sid)
+        except Exception as e:
+            results.append(e)
+    return results
 
-twilio_client = Client(account_sid, auth_token) if account_sid and auth_token else None
 
 class TwilioService:
     """Service for sending SMS notifications via Twilio"""
     
     @staticmethod
-    def send_sms(to_phone, message, user_id=None, order_id=None):
-        """Send an SMS message"""
+    def claim_notification(notification):
+        """Record a keyed notification before sending it; None if that event was already sent
+        
+        The unique (order_id, event_type) index makes the insert itself the
+        claim, so retries and racing workers can't send the same event twice.
+        A previously failed attempt is reclaimed so it can be retried.
+        """
+        try:
+            with db.session.begin_nested():
+                db.session.add(notification)
+            db.session.commit()
+            return notification
+        except IntegrityError:
+            pass
+        
+        key = {'order_id': notification.order_id, 'event_type': notification.event_type}
+        reclaimed = Notification.query.filter_by(status='failed', **key).update({
+            'status': 'pending',
+            'message': notification.message,
+            'body_purged_at': None,
+            'recipient': notification.recipient,
+            'retry_count': Notification.retry_count + 1,
+            'error_message': None,
+            'failed_at': None
+        }, synchronize_session=False)
+        db.session.commit()
+        
+        return Notification.query.filter_by(**key).first() if reclaimed else None
+    
+    @staticmethod
+    def send_sms(to_phone, message, user_id=None, order_id=None, event_type=None):
+        """Send an SMS message (at most once per order and event_type, when given)"""
+        twilio_client = get_twilio_client()
         if not twilio_client:
             print("Twilio not configured - SMS not sent")
             return None
         
+        notification = None
         try:
             # Create notification record
             notification = Notification(
                 user_id=user_id,
                 order_id=order_id,
+                event_type=event_type,
                 type='sms',
                 message=message,
                 recipient=to_phone,
                 status='pending'
             )
-            db.session.add(notification)
-            db.session.flush()
+            if event_type and order_id:
+                notification = TwilioService.claim_notification(notification)
+                if notification is None:
+                    print(f"Skipping duplicate {event_type} SMS for order {order_id}")
+                    return None
+            else:
+                db.session.add(notification)
+                db.session.flush()
             
             # Send SMS via Twilio
-            twilio_message = twilio_client.messages.create(
-                body=message,
-                from_=twilio_phone,
-                to=to_phone
-            )
+            with external_call('twilio', 'messages.create'):
+                twilio_message = twilio_client.messages.create(
+                    body=message,
+                    from_=twilio_phone,
+                    to=to_phone
+                )
             
             # Update notification with Twilio SID
             notification.twilio_sid = twilio_message.sid
@@ -60,105 +131,157 @@ class TwilioService:
             raise
     
     @staticmethod
-    def send_order_confirmation(order):
-        """Send order confirmation SMS to customer"""
-        message = f"""Go4me.ai Order Confirmed! 🎉
-
-Order #{order.order_number}
-Service: {order.service.name}
-Total: ${float(order.total_amount):.2f}
-
-We'll notify you when an agent accepts your order.
-
-Track: https://go4me.ai/order/{order.order_number}"""
+    def send_bulk_sms(messages):
+        """Send many SMS at once, keeping them all in flight from this one thread
+        
+        `messages` is a list of dicts with to_phone, message and optionally
+        user_id/order_id/event_type. Every send gets a Notification row;
+        failures are recorded on it rather than raised. Events already sent
+        for an order are skipped; failed ones are retried.
+        """
+        if not messages:
+            return []
+        if not get_twilio_client():
+            print("Twilio not configured - SMS not sent")
+            return []
+        
+        notifications = [
+            Notification(
+                user_id=item.get('user_id'),
+                order_id=item.get('order_id'),
+                event_type=item.get('event_type'),
+                type='sms',
+                message=item['message'],
+                recipient=item['to_phone'],
+                status='pending'
+            )
+            for item in messages
+        ]
+        
+        # Drop events already on record in one query, then insert the rest together.
+        # Failed ones are reclaimed for a retry, as single sends do.
+        retries = []
+        keys = {(n.order_id, n.event_type) for n in notifications if n.order_id and n.event_type}
+        if keys:
+            order_ids = {order_id for order_id, _ in keys}
+            existing = {(order_id, event_type): status for order_id, event_type, status in db.session.query(
+                Notification.order_id, Notification.event_type, Notification.status
+            ).filter(
+                Notification.order_id.in_(order_ids),
+                Notification.event_type.in_({event_type for _, event_type in keys})
+            )}
+            retries = [n for n in notifications if existing.get((n.order_id, n.event_type)) == 'failed']
+            notifications = [n for n in notifications if (n.order_id, n.event_type) not in existing]
+        
+        # (id, recipient, message) per claimed send. Claims are committed before
+        # sending, so concurrent senders see them and no connection is held open
+        # while Twilio works.
+        claimed = []
+        try:
+            with db.session.begin_nested():
+                db.session.add_all(notifications)
+            claimed = [(n.id, n.recipient, n.message) for n in notifications]
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race for some of them - claim one at a time instead
+            retries = [Notification(
+                user_id=n.user_id, order_id=n.order_id, event_type=n.event_type,
+                type='sms', message=n.message, recipient=n.recipient, status='pending'
+            ) for n in notifications] + retries
+        
+        for notification in retries:
+            notification = TwilioService.claim_notification(notification)
+            if notification is not None:
+                claimed.append((notification.id, notification.recipient, notification.message))
+        if retries:
+            db.session.commit()  # end the read transaction the reclaims left open
+        
+        if not claimed:
+            return []
+        
+        batch = [(recipient, message) for _, recipient, message in claimed]
+        if async_twilio_available():
+            results = asyncio.run(_send_batch(batch))
+        else:
+            results = _send_blocking(batch)
+        
+        now = datetime.utcnow()
+        outcomes = []
+        for (notification_id, recipient, _), result in zip(claimed, results):
+            if isinstance(result, Exception):
+                print(f"Error sending SMS to {recipient}: {str(result)}")
+                outcomes.append({'id': notification_id, 'status': 'failed', 'failed_at': now,
+                                 'error_message': str(result)})
+            else:
+                outcomes.append({'id': notification_id, 'status': 'sent', 'sent_at': now, 'twilio_sid': result})
+        
+        # ORM bulk UPDATE by primary key, then one query for the updated rows
+        db.session.execute(update(Notification), outcomes)
+        db.session.commit()
+        
+        ids = [notification_id for notification_id, _, _ in claimed]
+        by_id = {n.id: n for n in Notification.query.filter(Notification.id.in_(ids))}
+        return [by_id[notification_id].to_dict() for notification_id in ids]
+    
+    @staticmethod
+    def send_order_event(order_id, event_type):
+        """Send an order's templated SMS to its customer, at most once per event"""
+        context = order_sms_context(order_id)
         
         return TwilioService.send_sms(
-            to_phone=order.customer.phone,
-            message=message,
-            user_id=order.customer_id,
-            order_id=order.id
+            to_phone=context['customer_phone'],
+            message=render(event_type, context),
+            user_id=context['customer_id'],
+            order_id=order_id,
+            event_type=event_type
         )
     
+    @staticmethod
+    def send_order_confirmation(order):
+        """Send order confirmation SMS to customer"""
+        return TwilioService.send_order_event(order.id, 'order_confirmed')
+    
     @staticmethod
     def send_agent_assigned(order):
         """Notify customer that an agent has been assigned"""
-        agent_name = order.agent.user.first_name
-        
-        message = f"""Your Go4me.ai order has been accepted! 🚀
-
-Order #{order.order_number}
-Agent: {agent_name}
-Phone: {order.agent.user.phone}
-
-{agent_name} will contact you shortly.
-
-Track: https://go4me.ai/order/{order.order_number}"""
-        
-        return TwilioService.send_sms(
-            to_phone=order.customer.phone,
-            message=message,
-            user_id=order.customer_id,
-            order_id=order.id
-        )
+        return TwilioService.send_order_event(order.id, 'agent_assigned')
     
     @staticmethod
     def send_order_started(order):
         """Notify customer that order has started"""
-        message = f"""Your gopher is on the way! 🏃
-
-Order #{order.order_number}
-Agent: {order.agent.user.first_name}
-
-You'll receive updates as your task progresses.
-
-Track: https://go4me.ai/order/{order.order_number}"""
-        
-        return TwilioService.send_sms(
-            to_phone=order.customer.phone,
-            message=message,
-            user_id=order.customer_id,
-            order_id=order.id
-        )
+        return TwilioService.send_order_event(order.id, 'order_started')
     
     @staticmethod
     def send_order_completed(order):
         """Notify customer that order is complete"""
-        message = f"""Your order is complete! ✅
-
-Order #{order.order_number}
-Total: ${float(order.total_amount):.2f}
-
-Photos and receipts are available in your dashboard.
-
-View: https://go4me.ai/order/{order.order_number}
-
-Thank you for using Go4me.ai!"""
-        
-        return TwilioService.send_sms(
-            to_phone=order.customer.phone,
-            message=message,
-            user_id=order.customer_id,
-            order_id=order.id
-        )
+        return TwilioService.send_order_event(order.id, 'order_completed')
     
     @staticmethod
     def send_new_job_alert(agent, order):
         """Alert agent about a new available job"""
-        message = f"""New Go4me.ai Job Available! 💼
-
-Service: {order.service.name}
-Pay: ${float(order.service_fee):.2f}
-Location: {order.pickup_address or 'See app'}
-
-Accept now: https://go4me.ai/agent/job/{order.id}"""
-        
         return TwilioService.send_sms(
             to_phone=agent.user.phone,
-            message=message,
+            message=render('new_job', order_sms_context(order.id)),
             user_id=agent.user_id,
-            order_id=order.id
+            order_id=order.id,
+            event_type=f"new_job:agent:{agent.id}"
         )
     
+    @staticmethod
+    def send_new_job_alerts(agents, order):
+        """Alert several agents about a new job in one concurrent batch"""
+        message = render('new_job', order_sms_context(order.id))
+        return TwilioService.send_bulk_sms([
+            {
+                'to_phone': agent.user.phone,
+                'message': message,
+                'user_id': agent.user_id,
+                'order_id': order.id,
+                'event_type': f"new_job:agent:{agent.id}"
+            }
+            for agent in agents
+        ])
+    
     @staticmethod
     def send_verification_code(phone, code):
         """Send verification code for phone verification"""
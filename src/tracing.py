@@ -0,0 +1,219 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, g, request
+from sqlalchemy import event
+
+# W3C Trace Context header: version-traceid-parentid-flags
+TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current_span = ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed operation within a trace, exported in OTLP/JSON field names"""
+    
+    def __init__(self, trace, name, parent_id=None, kind='internal', attributes=None):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+    
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+    
+    def record_error(self, error):
+        self.status = 'error'
+        self.attributes['exception.type'] = type(error).__name__
+        self.attributes['exception.message'] = str(error)[:500]
+    
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+    
+    def to_dict(self):
+        return {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'durationMs': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'attributes': self.attributes,
+            'status': self.status,
+        }
+
+
+class Trace:
+    """Spans collected for one request, exported together when it finishes"""
+    
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.spans = []
+
+
+class ConsoleExporter:
+    """Print finished spans as JSON lines on stdout"""
+    
+    def export(self, spans):
+        for span in spans:
+            print(json.dumps(span.to_dict()), flush=True)
+
+
+class FileExporter:
+    """Append finished spans as JSON lines to a local file"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def export(self, spans):
+        lines = ''.join(json.dumps(span.to_dict()) + '\n' for span in spans)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+
+def current_span():
+    """The active span, or None when the current request isn't traced"""
+    return _current_span.get()
+
+
+def begin_span(name, kind='internal', attributes=None):
+    """Open a child of the active span without making it active; caller ends it"""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+@contextmanager
+def start_span(name, kind='internal', attributes=None):
+    """Run a block as a child span of the active span (no-op when untraced)"""
+    span = begin_span(name, kind, attributes)
+    if span is None:
+        yield None
+        return
+    
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def _start_request_span():
+    match = TRACEPARENT_RE.match(request.headers.get('traceparent', ''))
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        sampled = int(flags, 16) & 1
+    else:
+        trace_id, parent_id = None, None
+        sampled = random.random() < current_app.config['TRACE_SAMPLE_RATE']
+    
+    if not sampled:
+        return
+    
+    span = Span(Trace(trace_id), f"{request.method} {request.endpoint or 'unmatched'}", parent_id, 'server', {
+        'http.method': request.method,
+        'http.route': request.url_rule.rule if request.url_rule else None,
+        'http.target': request.path,
+    })
+    g.trace_span = span
+    g.trace_token = _current_span.set(span)
+
+
+def _annotate_response(response):
+    span = g.get('trace_span')
+    if span is not None:
+        span.set_attribute('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            span.status = 'error'
+        response.headers['traceparent'] = f"00-{span.trace.trace_id}-{span.span_id}-01"
+    return response
+
+
+def _finish_request_span(error=None):
+    span = g.pop('trace_span', None)
+    if span is None:
+        return
+    
+    if error is not None:
+        span.record_error(error)
+    _current_span.reset(g.pop('trace_token'))
+    span.end()
+    
+    try:
+        current_app.extensions['trace_exporter'].export(span.trace.spans)
+    except Exception as e:
+        print(f"Failed to export trace: {str(e)}")
+
+
+def _instrument_engine(engine):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = begin_span('db.query', 'client', {
+            'db.system': engine.dialect.name,
+            'db.statement': statement[:1000],
+        })
+        if span is not None:
+            context._trace_span = span
+    
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, '_trace_span', None)
+        if span is not None:
+            span.set_attribute('db.rows', cursor.rowcount)
+            span.end()
+    
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, '_trace_span', None)
+        if span is not None:
+            span.record_error(exception_context.original_exception)
+            span.end()
+    
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(engine, 'handle_error', handle_error)
+
+
+def init_tracing(app):
+    """Trace requests, SQL and external calls when TRACE_EXPORTER is configured"""
+    from src.database import db
+    
+    app.config.setdefault('TRACE_EXPORTER', None)  # 'console' or 'file'
+    app.config.setdefault('TRACE_FILE', 'traces.jsonl')
+    app.config.setdefault('TRACE_SAMPLE_RATE', 1.0)
+    
+    exporter_name = app.config['TRACE_EXPORTER']
+    if not exporter_name:
+        return
+    
+    if exporter_name == 'file':
+        app.extensions['trace_exporter'] = FileExporter(os.path.abspath(app.config['TRACE_FILE']))
+    else:
+        app.extensions['trace_exporter'] = ConsoleExporter()
+    
+    # Open the request span before any other hook runs
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request_span)
+    app.after_request(_annotate_response)
+    app.teardown_request(_finish_request_span)
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            _instrument_engine(engine)
@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+import pytest
+
+# Tests use DATABASE_URL when it's set (e.g. a Postgres test database),
+# otherwise a throwaway SQLite file
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+from src.app import create_app
+from src.database import db
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The app with its schema in place (no-op on an already migrated database)"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def dialect(app):
+    """Name of the database dialect under test ('sqlite', 'postgresql')"""
+    with app.app_context():
+        return db.engine.dialect.name
@@ -0,0 +1,84 @@
+"""Completing and cancelling many orders of one agent concurrently loses no counter update
+
+Needs real row-lock contention, so it only runs with DATABASE_URL pointing at
+a Postgres test database (SQLite serialises writers). The rows it creates are
+removed afterwards.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.database import db
+from src.models import Agent, Notification, Order, OrderEvent, Service, User
+from src.services.order_service import OrderService
+
+ORDERS = 200
+THREADS = 16
+SERVICE_FEE_CENTS = 1250
+
+
+@pytest.fixture
+def busy_agent(app, dialect):
+    """An agent with ORDERS in-progress orders; yields (agent id, order ids)"""
+    if dialect != 'postgresql':
+        pytest.skip('needs DATABASE_URL pointing at Postgres')
+    
+    tag = uuid.uuid4().hex[:8]
+    with app.app_context():
+        service = Service(name='Race', slug=f"race-{tag}", base_price_cents=SERVICE_FEE_CENTS)
+        user = User(email=f"race-{tag}@example.com", password_hash='x', first_name='Race',
+                    last_name='Agent', phone='+12135550100', role='agent')
+        db.session.add_all([service, user])
+        db.session.flush()
+        
+        agent = Agent(user_id=user.id, is_available=False, background_check_status='approved',
+                      total_jobs=ORDERS, completed_jobs=0, cancelled_jobs=0, total_earnings_cents=0)
+        db.session.add(agent)
+        db.session.flush()
+        
+        orders = [
+            Order(order_number=f"RACE-{tag}-{i}", service_id=service.id, agent_id=agent.id,
+                  description='counter race', service_fee_cents=SERVICE_FEE_CENTS,
+                  total_amount_cents=SERVICE_FEE_CENTS, status='in_progress', guest_phone='+12135550101')
+            for i in range(ORDERS)
+        ]
+        db.session.add_all(orders)
+        db.session.commit()
+        agent_id, user_id, service_id = agent.id, user.id, service.id
+        order_ids = [order.id for order in orders]
+    
+    yield agent_id, order_ids
+    
+    with app.app_context():
+        for model in (OrderEvent, Notification):
+            model.query.filter(model.order_id.in_(order_ids)).delete(synchronize_session=False)
+        Order.query.filter(Order.id.in_(order_ids)).delete(synchronize_session=False)
+        Agent.query.filter_by(id=agent_id).delete()
+        User.query.filter_by(id=user_id).delete()
+        Service.query.filter_by(id=service_id).delete()
+        db.session.commit()
+
+
+def test_concurrent_transitions_keep_agent_counters(app, busy_agent):
+    agent_id, order_ids = busy_agent
+    # Every fifth order is cancelled, the rest completed
+    actions = ['cancel' if i % 5 == 0 else 'complete' for i in range(ORDERS)]
+    
+    def move_order(order_id, action):
+        with app.app_context():
+            if action == 'cancel':
+                OrderService.cancel_order(order_id)
+            else:
+                OrderService.complete_order(order_id)
+    
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(move_order, order_ids, actions))
+    
+    with app.app_context():
+        agent = db.session.get(Agent, agent_id)
+        assert (agent.completed_jobs, agent.cancelled_jobs, agent.total_earnings_cents) == (
+            actions.count('complete'),
+            actions.count('cancel'),
+            SERVICE_FEE_CENTS * actions.count('complete'),
+        )
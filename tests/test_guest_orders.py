@@ -0,0 +1,39 @@
+"""Guest checkout orders are only created for known, active services"""
+
+import uuid
+
+import pytest
+from src.database import db
+from src.models import Order
+from src.services.order_service import OrderService
+
+
+def test_create_rejects_unknown_service(app):
+    slug = f"no-such-service-{uuid.uuid4().hex[:8]}"
+    with app.app_context():
+        orders_before = db.session.query(Order.id).count()
+    
+    response = app.test_client().post('/api/orders/create', json={
+        'service': slug,
+        'name': 'Guest',
+        'phone': '(213) 555-0100',
+    })
+    
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': f"Unknown service: {slug}"}
+    with app.app_context():
+        assert db.session.query(Order.id).count() == orders_before
+
+
+def test_create_guest_order_rejects_unknown_service(app):
+    with app.app_context():
+        with pytest.raises(ValueError, match='Service not available'):
+            OrderService.create_guest_order(
+                service_slug=f"no-such-service-{uuid.uuid4().hex[:8]}",
+                customer_name='Guest',
+                customer_phone='+12135550100',
+                description='Anything',
+                line_items=[],
+                service_fee_cents=1000
+            )
+        db.session.rollback()
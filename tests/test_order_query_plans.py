@@ -0,0 +1,189 @@
+"""Every OrderService read is served by the index meant for it, checked with EXPLAIN
+
+Runs on the throwaway SQLite database by default, or on DATABASE_URL (e.g.
+Postgres). Each test seeds a realistic spread of orders and refreshes the
+planner statistics inside one transaction, EXPLAINs there and rolls back, so
+plans don't depend on whatever the tables happen to hold. On Postgres
+sequential scans are also disabled, so only index choices are compared.
+"""
+
+import re
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, insert
+from src.database import db
+from src.models import Agent, Order, OrderPhoto, Service, User
+from src.services.order_service import OrderService
+
+CUSTOMERS = 50
+AGENTS = 20
+ORDERS = 2000
+
+# Each query, and the index every statement it sends must use, per table.
+# 'order_photos' is the photo selectin load, served by its unique constraint.
+QUERIES = [
+    ('get_available_orders', lambda ids: OrderService.get_available_orders(), {
+        'orders': 'ix_orders_available_created',
+        'order_photos': 'uq_order_photos_order_kind_hash',
+    }),
+    ('get_customer_orders', lambda ids: OrderService.get_customer_orders(ids.customer_id), {
+        'orders': 'ix_orders_customer_status_created',
+        'orders_archive': 'ix_orders_archive_customer_created',
+        'order_photos': 'uq_order_photos_order_kind_hash',
+    }),
+    ('get_customer_orders(status)', lambda ids: OrderService.get_customer_orders(ids.customer_id, 'pending'), {
+        'orders': 'ix_orders_customer_status_created',
+        'order_photos': 'uq_order_photos_order_kind_hash',
+    }),
+    ('get_agent_orders', lambda ids: OrderService.get_agent_orders(ids.agent_id), {
+        'orders': 'ix_orders_agent_status_created',
+        'orders_archive': 'ix_orders_archive_agent_created',
+        'order_photos': 'uq_order_photos_order_kind_hash',
+    }),
+    ('get_agent_orders(status)', lambda ids: OrderService.get_agent_orders(ids.agent_id, 'completed'), {
+        'orders': 'ix_orders_agent_status_created',
+        'orders_archive': 'ix_orders_archive_agent_created',
+        'order_photos': 'uq_order_photos_order_kind_hash',
+    }),
+    ('generate_order_number', lambda ids: OrderService.generate_order_number(), {
+        'orders': 'ix_orders_order_number',
+        'orders_archive': 'ix_orders_archive_order_number',
+    }),
+]
+
+# SQLite's planner picks the full (agent_id, status, created_at) index over the
+# partial one, even with statistics: it serves the same rows in the same order.
+# The partial index is for Postgres, where it is a fraction of the size.
+SQLITE_EXPECTED = {
+    'get_available_orders': {'orders': 'ix_orders_agent_status_created'},
+}
+# SQLite names the indexes behind UNIQUE constraints itself
+SQLITE_INDEX_NAMES = {'uq_order_photos_order_kind_hash': 'sqlite_autoindex_order_photos_1'}
+
+SQLITE_SCAN = re.compile(r'^(?:SEARCH|SCAN) (?P<table>\w+)(?: USING (?:COVERING )?INDEX (?P<index>\w+))?')
+PG_INDEX_SCAN = re.compile(r'Index (?:Only )?Scan(?: Backward)? using (?P<index>\w+) on (?P<table>\w+)')
+PG_BITMAP_HEAP_SCAN = re.compile(r'Bitmap Heap Scan on (?P<table>\w+)')
+PG_BITMAP_INDEX_SCAN = re.compile(r'Bitmap Index Scan on (?P<index>\w+)')
+PG_SEQ_SCAN = re.compile(r'Seq Scan on (?P<table>\w+)')
+
+
+def capture_statements(fn):
+    """Run fn and return the (statement, parameters) it sent to the database"""
+    captured = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return captured
+
+
+def table_scans(connection, statement, parameters):
+    """(plan lines, [(table, index)]) for a statement; index is None for a full scan"""
+    scans = []
+    
+    if connection.dialect.name == 'sqlite':
+        plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        for line in plan:
+            match = SQLITE_SCAN.match(line)
+            if match:
+                scans.append((match['table'], match['index']))
+        return plan, scans
+    
+    plan = [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+    bitmap_table = None
+    for line in plan:
+        if match := PG_INDEX_SCAN.search(line):
+            scans.append((match['table'], match['index']))
+        elif match := PG_BITMAP_HEAP_SCAN.search(line):
+            bitmap_table = match['table']
+        elif match := PG_BITMAP_INDEX_SCAN.search(line):
+            scans.append((bitmap_table, match['index']))
+        elif match := PG_SEQ_SCAN.search(line):
+            scans.append((match['table'], None))
+    return plan, scans
+
+
+@pytest.fixture
+def seeded_orders(app, dialect):
+    """Orders spread over customers, agents and statuses, with fresh statistics; rolled back afterwards"""
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    
+    with app.app_context():
+        service = Service(name='Plans', slug=f"plans-{tag}", base_price_cents=1000)
+        users = [
+            User(email=f"plans-{tag}-{i}@example.com", password_hash='x', first_name='Plan',
+                 last_name=str(i), phone='+12135550100', role='agent' if i < AGENTS else 'customer')
+            for i in range(AGENTS + CUSTOMERS)
+        ]
+        db.session.add_all([service, *users])
+        db.session.flush()
+        agents = [Agent(user_id=user.id) for user in users[:AGENTS]]
+        db.session.add_all(agents)
+        db.session.flush()
+        customer_ids = [user.id for user in users[AGENTS:]]
+        
+        # 1% waiting for an agent, the rest assigned and mostly finished; two photos each
+        statuses = ('completed', 'completed', 'completed', 'cancelled', 'in_progress')
+        order_ids = db.session.execute(insert(Order).returning(Order.id), [{
+            'order_number': f"PLAN-{tag}-{i}",
+            'service_id': service.id,
+            'customer_id': customer_ids[i % CUSTOMERS],
+            'agent_id': None if i % 100 == 0 else agents[i % AGENTS].id,
+            'status': 'pending' if i % 100 == 0 else statuses[i % len(statuses)],
+            'description': 'plan check',
+            'service_fee_cents': 1000,
+            'total_amount_cents': 1000,
+            'created_at': now - timedelta(minutes=i),
+        } for i in range(ORDERS)]).scalars().all()
+        db.session.execute(insert(OrderPhoto), [{
+            'order_id': order_id,
+            'kind': kind,
+            'content_hash': f"{i:063x}{kind[0]}",
+            'content_type': 'image/jpeg',
+            'extension': 'jpg',
+            'size_bytes': 100000,
+        } for i, order_id in enumerate(order_ids) for kind in ('completion', 'receipt')])
+        db.session.execute(db.text('ANALYZE'))
+        if dialect == 'postgresql':
+            db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+        
+        try:
+            yield SimpleNamespace(customer_id=customer_ids[0], agent_id=agents[0].id)
+        finally:
+            db.session.rollback()
+
+
+@pytest.mark.parametrize('name, query, expected', QUERIES, ids=[name for name, _, _ in QUERIES])
+def test_query_uses_expected_index(app, dialect, seeded_orders, name, query, expected):
+    if dialect == 'sqlite':
+        expected = {
+            table: SQLITE_INDEX_NAMES.get(index, index)
+            for table, index in {**expected, **SQLITE_EXPECTED.get(name, {})}.items()
+        }
+    
+    statements = capture_statements(lambda: query(seeded_orders))
+    assert statements, f"{name} sent no statements"
+    
+    # EXPLAIN in the seeding transaction, where the rows and statistics are visible
+    connection = db.session.connection()
+    used = {}
+    for statement, parameters in statements:
+        plan, scans = table_scans(connection, statement, parameters)
+        assert scans, "No table access found in plan:\n" + '\n'.join(plan)
+        for table, index in scans:
+            assert index == expected.get(table), (
+                f"{name} reads {table} with {index or 'a full scan'}, "
+                f"expected {expected.get(table)}:\n" + '\n'.join(plan)
+            )
+            used[table] = index
+    
+    assert used == expected